@@ -1,39 +1,57 @@
-from flask import Flask, render_template, request, redirect, url_for, make_response, session, send_from_directory, jsonify
+from flask import Flask, render_template, request, redirect, url_for, make_response, session, send_from_directory, jsonify, g, Response, stream_with_context, has_request_context, before_render_template, template_rendered, Request
 import os
+import click
+import csv
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from io import BytesIO
-from xhtml2pdf import pisa
+from psycopg2.extras import RealDictCursor, execute_values, Json
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from io import BytesIO, StringIO
 from dotenv import load_dotenv
-from reportlab.platypus import Paragraph
 from flask_mail import Mail, Message
-from collections import defaultdict
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 from functools import wraps
 from flask import flash
 from flask import send_file
-import secrets
-from datetime import datetime, timedelta
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 import uuid
 from datetime import datetime, timezone
-from werkzeug.utils import secure_filename  # put this at the top of your file if not already
-from werkzeug.exceptions import RequestEntityTooLarge
-from pytz import timezone
-import zipfile
-from zipfile import ZipFile
-from reportlab.pdfgen import canvas
-import tempfile
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
 import base64
+import tempfile
+import threading
+import time
+import atexit
+import fcntl
+import hashlib
+import hmac
+import json
+import mimetypes
+import shutil
+import signal
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+from urllib.parse import quote
+
+
+# PDF engines (xhtml2pdf, and WeasyPrint with Pango/Cairo when installed) and
+# zipfile/multiprocessing are imported inside the functions that use them, so
+# workers start without them; `flask --app app check-startup` enforces this.
+_weasyprint = None
 
 
-# WeasyPrint import
-try:
-    from weasyprint import HTML, CSS
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    print("WeasyPrint not available, using xhtml2pdf only")
-    WEASYPRINT_AVAILABLE = False
+def load_weasyprint():
+    """The weasyprint module, or None if it is not installed."""
+    global _weasyprint
+    if _weasyprint is None:
+        try:
+            import weasyprint
+            _weasyprint = weasyprint
+        except (ImportError, OSError):
+            print("WeasyPrint not available, using xhtml2pdf only")
+            _weasyprint = False
+    return _weasyprint or None
 
 
 
@@ -51,12 +69,51 @@ def file_too_large(e):
     flash("Your uploaded file is too large. The limit is 5MB.")
     return redirect(request.referrer or url_for('index')), 413
 
+
+@app.errorhandler(UnsupportedMediaType)
+def unsupported_upload(e):
+    flash(e.description)
+    return redirect(request.referrer or url_for('index')), 415
+
 app.secret_key = os.getenv("SECRET_KEY") or "supersecret"
 
-UPLOAD_DIR = '/mnt/data/uploads'
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", '/mnt/data/uploads')
 # UPLOAD_DIR = os.path.join(os.getcwd(), 'uploads')
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Protected files
+# Uploads and export archives are only served after Flask has checked the
+# session, but the bytes need not go through the worker. FILE_OFFLOAD picks who
+# sends them:
+#   (empty)           Flask streams the file itself: Range requests, ETag and
+#                     Last-Modified are handled, and gunicorn uses sendfile(2)
+#                     for whole-file responses.
+#   x-sendfile        an X-Sendfile header with the absolute path (Apache
+#                     mod_xsendfile, lighttpd).
+#   x-accel-redirect  an X-Accel-Redirect to FILE_OFFLOAD_PREFIX/<location>/<name>,
+#                     an nginx `internal` location aliased to the directory.
+# The proxy then handles Range and conditional requests itself.
+FILE_OFFLOAD = os.getenv("FILE_OFFLOAD", "").lower()
+FILE_OFFLOAD_PREFIX = os.getenv("FILE_OFFLOAD_PREFIX", "/protected").rstrip("/")
+app.config["USE_X_SENDFILE"] = FILE_OFFLOAD == "x-sendfile"
+
+
+def send_protected_file(directory, filename, location, **kwargs):
+    """Serve directory/filename (already authorised) as FILE_OFFLOAD says; 404 if it is missing."""
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        return "File not found.", 404
+
+    if FILE_OFFLOAD == "x-accel-redirect":
+        response = Response(mimetype=kwargs.get("mimetype") or mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = f"{FILE_OFFLOAD_PREFIX}/{location}/{quote(filename)}"
+        if kwargs.get("as_attachment"):
+            response.headers.set("Content-Disposition", "attachment", filename=kwargs.get("download_name") or filename)
+    else:
+        response = send_file(path, conditional=True, etag=True, **kwargs)
+    response.cache_control.private = True
+    return response
+
 
 def login_required(f):
     @wraps(f)
@@ -76,9 +133,73 @@ def get_application_by_user(user_id):
     cursor = conn.cursor(cursor_factory=RealDictCursor)
     cursor.execute("SELECT * FROM applications WHERE user_id = %s", (user_id,))
     application = cursor.fetchone()
-    conn.close()
     return application
 
+# Latest application for a user, with its activities, in one query.
+# The application id is remembered in the session so that repeat lookups
+# (autosave every few seconds) are a primary-key hit rather than
+# ORDER BY id DESC LIMIT 1.
+# Joined onto "applications a": act.activities is the application's activities as a JSON array
+ACTIVITIES_JSON_JOIN = """
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object(
+            'id', id, 'activity_type', activity_type, 'activity_position', activity_position,
+            'activity_org', activity_org, 'activity_desc', activity_desc
+        ) ORDER BY id) AS activities
+        FROM activities WHERE application_id = a.id
+    ) act ON true"""
+
+
+APPLICATION_BY_ID = " WHERE a.id = %s AND a.user_id = %s"
+LATEST_APPLICATION = " WHERE a.user_id = %s ORDER BY a.id DESC LIMIT 1"
+ACTIVITIES_FOR_APPLICATION_SQL = "SELECT * FROM activities WHERE application_id = %s ORDER BY id"
+USER_BY_EMAIL_SQL = "SELECT * FROM users WHERE email = %s"
+
+
+def application_query(columns=None, with_activities=True):
+    """SELECT ... FROM applications a, before the WHERE clause (APPLICATION_BY_ID or LATEST_APPLICATION)."""
+    cols = "a.*" if columns is None else ", ".join(f"a.{c}" for c in dict.fromkeys(["id"] + list(columns)))
+    if with_activities:
+        return f"SELECT {cols}, COALESCE(act.activities, '[]') AS activities FROM applications a {ACTIVITIES_JSON_JOIN}"
+    return f"SELECT {cols} FROM applications a"
+
+
+def load_application(user_id, app_id=None, columns=None, with_activities=True):
+    """Return (application, activities) for user_id, or (None, []).
+
+    app_id loads that application (still scoped to the user) instead of the
+    latest one. columns limits the applications columns selected (default
+    all); "id" is always included.
+    """
+    # A draft still in the autosave buffer is written first, so readers see it
+    flush_pending_autosave(user_id)
+
+    query = application_query(columns, with_activities)
+
+    use_session = app_id is None and has_request_context() and session.get("user_id") == user_id
+    cached_id = session.get("application_id") if use_session else None
+
+    cursor = get_connection().cursor(cursor_factory=RealDictCursor)
+    application = None
+    if app_id is not None or cached_id is not None:
+        cursor.execute(query + APPLICATION_BY_ID, (app_id or cached_id, user_id))
+        application = cursor.fetchone()
+    if application is None and app_id is None:
+        cursor.execute(query + LATEST_APPLICATION, (user_id,))
+        application = cursor.fetchone()
+
+    if application is None:
+        if use_session:
+            session.pop("application_id", None)
+        return None, []
+
+    # Any assignment marks the session modified and re-sends the cookie
+    if use_session and session.get("application_id") != application["id"]:
+        session["application_id"] = application["id"]
+    activities = application.pop("activities", []) if with_activities else []
+    return application, activities
+
+
 # REGISTRATION ROUTE
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -89,17 +210,15 @@ def register():
 
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+        cursor.execute(USER_BY_EMAIL_SQL, (email,))
         existing = cursor.fetchone()
 
         if existing:
-            conn.close()
             return render_template("register.html", error="An account with this email already exists.")
 
         hash_pw = generate_password_hash(password)
         cursor.execute("INSERT INTO users (email, password_hash, student_name) VALUES (%s, %s, %s)", (email, hash_pw, student_name))
         conn.commit()
-        conn.close()
 
         return redirect(url_for('login_user'))
 
@@ -116,6 +235,7 @@ def logout_user():
     session.pop('user_id', None)
     session.pop('email', None)
     session.pop('student_name', None)
+    session.pop('application_id', None)
     return redirect(url_for('login_user'))
 
 
@@ -132,11 +252,360 @@ app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_USERNAME")
 
 mail = Mail(app)
 
+
+# Email outbox
+# Requests only insert into email_outbox (in their own transaction); the
+# `flask --app app send-outbox` worker delivers them, one SMTP connection per
+# batch, retrying failures with exponential backoff.
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 20))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 6))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))
+
+
+def queue_email(cursor, subject, recipients, body, html=None, bcc=None):
+    cursor.execute("""
+        INSERT INTO email_outbox (subject, recipients, bcc, body, html)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (subject, list(recipients), list(bcc or []), body, html))
+
+
+# SKIP LOCKED lets several workers drain the queue without double-sending
+OUTBOX_DUE_SQL = """
+    SELECT id, subject, recipients, bcc, body, html, attempts FROM email_outbox
+    WHERE status = 'pending' AND next_attempt_at <= now()
+    ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED
+"""
+
+
+def send_outbox_batch():
+    """Deliver up to OUTBOX_BATCH_SIZE due messages. Returns how many were attempted."""
+    with pooled_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(OUTBOX_DUE_SQL, (OUTBOX_BATCH_SIZE,))
+        batch = cursor.fetchall()
+        if not batch:
+            conn.rollback()
+            return 0
+
+        sent, errors = [], {}
+        started = time.perf_counter()
+        try:
+            with mail.connect() as smtp:
+                for row in batch:
+                    msg = Message(subject=row["subject"], recipients=row["recipients"], bcc=row["bcc"],
+                                  sender=app.config["MAIL_USERNAME"], body=row["body"], html=row["html"])
+                    try:
+                        with timed("smtp"):
+                            smtp.send(msg)
+                        sent.append(row["id"])
+                    except Exception as e:
+                        errors[row["id"]] = e
+        except Exception as e:
+            # Could not open (or lost) the SMTP connection: everything unsent is retried
+            for row in batch:
+                if row["id"] not in sent:
+                    errors.setdefault(row["id"], e)
+        print(f"Outbox: {len(sent)} of {len(batch)} email(s) sent in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        if sent:
+            cursor.execute("UPDATE email_outbox SET status = 'sent', sent_at = now() WHERE id = ANY(%s)", (sent,))
+        for row in batch:
+            if row["id"] not in errors:
+                continue
+            attempts = row["attempts"] + 1
+            cursor.execute("""
+                UPDATE email_outbox SET attempts = %s, last_error = %s, status = %s,
+                    next_attempt_at = now() + make_interval(secs => %s)
+                WHERE id = %s
+            """, (attempts, str(errors[row["id"]])[:1000],
+                  "failed" if attempts >= OUTBOX_MAX_ATTEMPTS else "pending",
+                  min(60 * 2 ** attempts, 3600), row["id"]))
+            print(f"Email {row['id']} failed (attempt {attempts}):", errors[row["id"]])
+        conn.commit()
+        return len(batch)
+
+
+def outbox_stats():
+    with pooled_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            SELECT
+                COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+                COUNT(*) FILTER (WHERE status = 'pending' AND attempts > 0) AS retrying,
+                COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+                EXTRACT(EPOCH FROM now() - MIN(created_at) FILTER (WHERE status = 'pending'))::float AS oldest_pending_seconds
+            FROM email_outbox
+        """)
+        return cursor.fetchone()
+
+
+@app.cli.command("send-outbox")
+@click.option("--once", is_flag=True, help="Drain what is due now and exit.")
+def send_outbox_command(once):
+    """Deliver queued emails from email_outbox."""
+    while True:
+        attempted = send_outbox_batch()
+        if attempted:
+            continue
+        if once:
+            break
+        time.sleep(OUTBOX_POLL_INTERVAL)
+
+# Request metrics
+# Every request is timed by endpoint, with the time spent in the database (per
+# query, with row counts), rendering templates, rendering PDFs and talking to
+# SMTP broken out. Histograms are kept per process (one set per gunicorn
+# worker, like pool_stats) and served in Prometheus text format on
+# /admin/metrics. Requests slower than SLOW_REQUEST_MS are printed with their
+# query breakdown.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 1000))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_metrics_lock = threading.Lock()
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _metrics_lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with _metrics_lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # labels -> [count per bucket..., count above the last bucket, sum]
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _metrics_lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with _metrics_lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{format_labels(key + (('le', bound),))} {cumulative}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {series[-1]}")
+                lines.append(f"{self.name}_count{format_labels(key)} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram("portal_request_duration_seconds", "Request latency by endpoint, method and status.")
+REQUEST_PART_SECONDS = Histogram("portal_request_part_seconds",
+                                 "Time a request spent in db, template, pdf or smtp work, by endpoint.")
+QUERY_SECONDS = Histogram("portal_db_query_seconds", "Latency of individual database queries, by endpoint.")
+QUERY_ROWS = Counter("portal_db_rows_total", "Rows returned or affected by database queries, by endpoint.")
+OPERATION_SECONDS = Histogram("portal_operation_seconds",
+                              "Latency of single PDF renders and SMTP sends, in or outside requests.")
+METRICS = [REQUEST_SECONDS, REQUEST_PART_SECONDS, QUERY_SECONDS, QUERY_ROWS, OPERATION_SECONDS]
+
+
+def current_request_metrics():
+    return g.get("request_metrics") if has_request_context() else None
+
+
+@contextmanager
+def timed(kind):
+    """Count the enclosed block as `kind` ("pdf", "smtp") time."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        OPERATION_SECONDS.observe(elapsed, kind=kind)
+        metrics = current_request_metrics()
+        if metrics is not None:
+            metrics[kind] += elapsed
+
+
+def query_label(query):
+    """Normalised SQL for logs and metrics, without the literal rows execute_values inlines."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    query = " ".join(str(query).split())
+    head, values, _ = query.partition(" VALUES ")
+    return f"{head} VALUES ..." if values else query[:200]
+
+
+def record_query(query, seconds, rows):
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics["queries"].append((query_label(query), seconds, max(rows, 0)))
+
+
+class InstrumentedCursorMixin:
+    """Times execute() and, for named cursors, each batch fetched while iterating."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query(query, time.perf_counter() - start, self.rowcount)
+
+    def __iter__(self):
+        if not self.name:
+            return super().__iter__()
+        return self._iter_batches()
+
+    def _iter_batches(self):
+        while True:
+            start = time.perf_counter()
+            rows = self.fetchmany(self.itersize)
+            record_query(f"FETCH {self.itersize} FROM {self.name}", time.perf_counter() - start, len(rows))
+            if not rows:
+                return
+            yield from rows
+
+
+_instrumented_cursors = {}
+
+
+def instrumented_cursor_class(base):
+    if base not in _instrumented_cursors:
+        _instrumented_cursors[base] = type(f"Instrumented{base.__name__}", (InstrumentedCursorMixin, base), {})
+    return _instrumented_cursors[base]
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = instrumented_cursor_class(base)
+        return super().cursor(*args, **kwargs)
+
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics["template_started"].append(time.perf_counter())
+
+
+@template_rendered.connect_via(app)
+def stop_template_timer(sender, template, context, **extra):
+    metrics = current_request_metrics()
+    if metrics is not None and metrics["template_started"]:
+        metrics["template"] += time.perf_counter() - metrics["template_started"].pop()
+
+
+@app.before_request
+def start_request_metrics():
+    g.request_metrics = {"start": time.perf_counter(), "status": 500, "queries": [], "template_started": [],
+                         "template": 0.0, "pdf": 0.0, "smtp": 0.0}
+
+
+@app.after_request
+def note_response_status(response):
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics["status"] = response.status_code
+    return response
+
+
+def stream_timed(generator):
+    """stream_with_context for a response body, with the request timed once the body has been sent."""
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics["deferred"] = True
+    return stream_with_context(generator)
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    metrics = g.get("request_metrics")
+    if metrics is None:
+        return
+    if metrics.pop("deferred", False):
+        # The body is still to be generated; stream_with_context tears the
+        # request down again once it has been sent, and the request is timed then.
+        # Other streamed responses (send_file) have no second teardown.
+        return
+    g.pop("request_metrics")
+    elapsed = time.perf_counter() - metrics["start"]
+    endpoint = request.endpoint or "unmatched"
+
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=metrics["status"])
+    db_seconds = 0.0
+    for _, seconds, rows in metrics["queries"]:
+        QUERY_SECONDS.observe(seconds, endpoint=endpoint)
+        QUERY_ROWS.inc(rows, endpoint=endpoint)
+        db_seconds += seconds
+    parts = {"db": db_seconds, "template": metrics["template"], "pdf": metrics["pdf"], "smtp": metrics["smtp"]}
+    for part, seconds in parts.items():
+        if seconds:
+            REQUEST_PART_SECONDS.observe(seconds, endpoint=endpoint, part=part)
+
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        by_query = {}
+        for sql, seconds, rows in metrics["queries"]:
+            entry = by_query.setdefault(sql, {"sql": sql, "calls": 0, "ms": 0.0, "rows": 0})
+            entry["calls"] += 1
+            entry["ms"] += seconds * 1000
+            entry["rows"] += rows
+        queries = sorted(by_query.values(), key=lambda q: q["ms"], reverse=True)[:10]
+        for entry in queries:
+            entry["ms"] = round(entry["ms"], 1)
+        print("SLOW REQUEST " + json.dumps({
+            "method": request.method, "path": request.path, "endpoint": endpoint, "status": metrics["status"],
+            "ms": round(elapsed * 1000, 1), **{f"{k}_ms": round(v * 1000, 1) for k, v in parts.items()},
+            "query_count": len(metrics["queries"]), "queries": queries,
+        }))
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.expose())
+    if _db_pool is not None and _db_pool_pid == os.getpid():
+        stats = _db_pool.stats()
+        for name in ("in_use", "idle", "waits", "timeouts"):
+            lines.append(f"# TYPE portal_db_pool_{name} gauge")
+            lines.append(f"portal_db_pool_{name} {stats[name]}")
+    return "\n".join(lines) + "\n"
+
+
 DB_CONFIG = {
     "host": os.getenv("DB_HOST"),
     "dbname": os.getenv("DB_NAME"),
     "user": os.getenv("DB_USER"),
     "password": os.getenv("DB_PASSWORD"),
+    "connection_factory": InstrumentedConnection,
 }
 
 def clean_input(value):
@@ -148,8 +617,649 @@ def sanitize_ascii(text):
     return text.encode("ascii", errors="ignore").decode()
 
 
+# Connection pool
+# Each gunicorn worker builds its own pool the first time it needs a connection
+# (pools must not be shared across fork). A request checks out at most one
+# connection, kept on flask.g and handed back in teardown_db_connection.
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
+
+class ConnectionPool:
+    """Bounded psycopg2 pool that waits for a free connection instead of failing."""
+
+    def __init__(self, minconn, maxconn, timeout, **connect_kwargs):
+        self._pool = ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_time_total = 0.0
+        self.checkout_time_max = 0.0
+
+    def getconn(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise PoolError(f"No database connection available after {self.timeout}s")
+
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                # Server dropped it while idle; replace with a fresh one
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.checkout_time_total += elapsed
+            self.checkout_time_max = max(self.checkout_time_max, elapsed)
+        return conn
+
+    def putconn(self, conn, rollback=False):
+        discard = bool(conn.closed)
+        if not discard:
+            try:
+                if rollback or conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        try:
+            self._pool.putconn(conn, close=discard)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "max_size": self.maxconn,
+                "in_use": self.in_use,
+                "idle": len(self._pool._pool),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "checkout_ms_avg": round(1000 * self.checkout_time_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_ms_max": round(1000 * self.checkout_time_max, 3),
+            }
+
+
+_db_pool = None
+_db_pool_pid = None
+_db_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _db_pool, _db_pool_pid
+    if _db_pool is None or _db_pool_pid != os.getpid():
+        with _db_pool_lock:
+            if _db_pool is None or _db_pool_pid != os.getpid():
+                _db_pool = ConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, **DB_CONFIG)
+                _db_pool_pid = os.getpid()
+    return _db_pool
+
+
+@contextmanager
+def pooled_connection():
+    """Borrow a pooled connection outside of a request (CLI, background jobs)."""
+    pool = get_pool()
+    conn = pool.getconn()
+    failed = False
+    try:
+        yield conn
+    except Exception:
+        failed = True
+        raise
+    finally:
+        pool.putconn(conn, rollback=failed)
+
+
 def get_connection():
-    return psycopg2.connect(**DB_CONFIG)
+    # One connection per request, returned to the pool on teardown
+    if "db_conn" not in g:
+        g.db_conn = get_pool().getconn()
+    return g.db_conn
+
+
+@contextmanager
+def request_or_pooled_connection():
+    """The request's connection inside a request; otherwise borrow one from the pool."""
+    if has_request_context():
+        yield get_connection()
+    else:
+        with pooled_connection() as conn:
+            yield conn
+
+
+@app.teardown_appcontext
+def teardown_db_connection(exc):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        get_pool().putconn(conn, rollback=exc is not None)
+
+
+# Schema migrations
+# migrations/NNNN_name.sql files are applied in order, each in its own
+# transaction, and recorded in schema_migrations. Run with
+# `flask --app app migrate`.
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATIONS_LOCK_ID = 720_2025  # pg advisory lock key; keeps concurrent deploys from racing
+
+
+def list_migrations():
+    return sorted(
+        (os.path.splitext(name)[0], os.path.join(MIGRATIONS_DIR, name))
+        for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql")
+    )
+
+
+def apply_migrations():
+    """Apply pending migrations. Returns the versions applied."""
+    applied_now = []
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        conn.commit()
+
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+        try:
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+            conn.commit()
+
+            for version, path in list_migrations():
+                if version in applied:
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    cursor.execute(f.read())
+                cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                conn.commit()
+                applied_now.append(version)
+        finally:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+            conn.commit()
+    return applied_now
+
+
+@app.cli.command("migrate")
+def migrate_command():
+    """Apply pending schema migrations."""
+    applied = apply_migrations()
+    for version in applied:
+        click.echo(f"Applied {version}")
+    if not applied:
+        click.echo("Schema is up to date.")
+
+
+# The queries that run on (nearly) every request, built by the same functions
+# and constants the views use. check-query-plans EXPLAINs each one and fails if
+# the planner has to read a whole table for it.
+def hot_queries():
+    from werkzeug.datastructures import MultiDict
+
+    page_after = (datetime(2025, 7, 1, tzinfo=timezone.utc), 1000)
+    queries = {
+        "latest application for user": (application_query() + LATEST_APPLICATION, (1,)),
+        "application by id": (application_query() + APPLICATION_BY_ID, (1, 1)),
+        "application version (ETag)":
+            (application_query(["updated_at"], with_activities=False) + APPLICATION_BY_ID, (1, 1)),
+        "activities for application": (ACTIVITIES_FOR_APPLICATION_SQL, (1,)),
+        "user by email": (USER_BY_EMAIL_SQL, ("someone@example.org",)),
+        "admin activity counts": (ADMIN_ACTIVITY_COUNTS_SQL, ([1, 2, 3],)),
+        "admin upload previews": (ADMIN_UPLOAD_PREVIEWS_SQL, (["/mnt/data/uploads/x.pdf"],)),
+        "due outbox messages": (OUTBOX_DUE_SQL, (OUTBOX_BATCH_SIZE,)),
+    }
+    for label, args in (("", {}), (", submitted", {"status": "submitted"}),
+                        (", by review status", {"review_status": "accepted"})):
+        queries["admin listing" + label] = admin_list_query(MultiDict(args))
+        queries["admin listing, next page" + label] = admin_list_query(MultiDict(args), page_after)
+        queries["admin listing, undated page" + label] = admin_list_query(MultiDict(args), (None, 1000))
+        queries["export" + label] = export_query(MultiDict(args))
+    return queries
+
+
+def full_scans_in_plan(plan):
+    """Tables a plan reads in full: sequential scans, and index scans that walk
+    the whole index filtering rows (no Index Cond) instead of seeking into it."""
+    node = plan.get("Node Type")
+    full_index_walk = node in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan and "Filter" in plan
+    found = [plan.get("Relation Name")] if node == "Seq Scan" or full_index_walk else []
+    for child in plan.get("Plans", []):
+        found.extend(full_scans_in_plan(child))
+    return found
+
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    """EXPLAIN the hot queries; exit 1 if any has to scan a whole table."""
+    failures = 0
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        # On small tables a seq scan is legitimately cheapest, so disable it:
+        # the planner then only picks one when no index can serve the query.
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for name, (sql, params) in hot_queries().items():
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            scans = full_scans_in_plan(cursor.fetchone()[0][0]["Plan"])
+            # An empty (or never analysed) table has no statistics to plan with
+            cursor.execute("SELECT relname FROM pg_class WHERE relname = ANY(%s) AND reltuples <= 0", (scans,))
+            empty = {row[0] for row in cursor.fetchall()}
+            if scans and set(scans) <= empty:
+                click.echo(f"skip  {name}: {', '.join(sorted(empty))} empty, plan not meaningful")
+            elif scans:
+                failures += 1
+                click.echo(f"FAIL  {name}: full scan of {', '.join(scans)}")
+            else:
+                click.echo(f"ok    {name}")
+        conn.rollback()
+
+    if failures:
+        raise SystemExit(1)
+
+
+# Startup profile
+# Modules that must not be imported just by loading app.py (gunicorn worker
+# boot); they belong behind a lazy import in the code that needs them.
+STARTUP_FORBIDDEN_MODULES = [
+    "xhtml2pdf", "reportlab", "pyhanko", "weasyprint",
+    "pandas", "numpy", "sklearn", "scipy", "matplotlib", "pygame",
+]
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", 600))
+
+
+def profile_startup_imports():
+    """Import app in a fresh interpreter under -X importtime.
+
+    Returns (total_ms, {top-level package: cumulative ms}).
+    """
+    import subprocess
+    import sys
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=app.root_path, capture_output=True, text=True, check=True,
+    )
+    packages = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # -X importtime indents by two spaces per nesting level; "app" sits at
+        # one space, so the modules app.py itself imports sit at three
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        if depth == 3:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + int(cumulative) / 1000
+        elif depth == 1 and name == "app":
+            total_us = int(cumulative)
+    return total_us / 1000, packages
+
+
+def forbidden_startup_modules():
+    """STARTUP_FORBIDDEN_MODULES that a fresh `import app` loads, directly or not."""
+    import subprocess
+    import sys
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app; print(' '.join(sys.modules))"],
+        cwd=app.root_path, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return sorted({m.split(".")[0] for m in loaded} & set(STARTUP_FORBIDDEN_MODULES))
+
+
+@app.cli.command("check-startup")
+@click.option("--top", default=10, help="How many of the slowest imports to list.")
+def check_startup_command(top):
+    """Profile `import app`; exit 1 on forbidden imports or an exceeded budget."""
+    total_ms, packages = profile_startup_imports()
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        click.echo(f"{ms:9.1f} ms  {name}")
+    click.echo(f"{total_ms:9.1f} ms  total (budget {STARTUP_IMPORT_BUDGET_MS:.0f} ms)")
+
+    forbidden = forbidden_startup_modules()
+
+    failed = False
+    if forbidden:
+        failed = True
+        click.echo(f"FAIL  imported at startup: {', '.join(forbidden)}")
+    if total_ms > STARTUP_IMPORT_BUDGET_MS:
+        failed = True
+        click.echo(f"FAIL  import took {total_ms:.0f} ms")
+    if failed:
+        raise SystemExit(1)
+
+
+# Static assets
+# `flask --app app build-assets` (run at deploy) copies every file in static/
+# to static/dist/ under a content-hashed name, writes .br and .gz variants of
+# the text assets and WebP/AVIF versions of the images, and records them all in
+# static/dist/manifest.json. url_for('static', filename=...) then points at the
+# hashed copy, which never changes and is served with a far-future immutable
+# Cache-Control, precompressed when the browser accepts it. Without a manifest
+# (or in debug mode) the plain files are served as before.
+STATIC_DIST = "dist"
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Text assets get precompressed siblings; images and PDFs are compressed already
+STATIC_COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html")
+# Tried in this order against Accept-Encoding
+STATIC_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Modern formats written alongside each image, best first; the original stays as the fallback
+STATIC_IMAGE_FORMATS = {".png": ("AVIF", "WEBP"), ".jpg": ("AVIF", "WEBP"), ".gif": ("WEBP",)}
+# Extension, MIME type, quality for still images, quality for animations (a GIF
+# re-encoded at 80 comes out larger than it went in)
+STATIC_IMAGE_TYPES = {"AVIF": (".avif", "image/avif", 60, 60), "WEBP": (".webp", "image/webp", 80, 60)}
+
+
+def load_static_manifest():
+    try:
+        with open(os.path.join(app.static_folder, STATIC_DIST, "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+STATIC_MANIFEST = load_static_manifest()
+
+
+def hashed_static_name(name, data, ext=None):
+    """dist/<name> with a content hash before the extension: styles.css -> dist/styles.1a2b3c4d5e6f.css"""
+    stem, original_ext = os.path.splitext(name)
+    return f"{STATIC_DIST}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext or original_ext}"
+
+
+def write_static_file(name, data):
+    path = os.path.join(app.static_folder, name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+    return name
+
+
+def transcode_image(path, image_format):
+    """The image re-encoded as image_format (animations included), or None if Pillow can't write it."""
+    from PIL import Image, features
+
+    if not features.check(image_format.lower()):
+        return None
+    _, _, quality, animated_quality = STATIC_IMAGE_TYPES[image_format]
+    out = BytesIO()
+    with Image.open(path) as image:
+        if getattr(image, "is_animated", False):
+            image.save(out, image_format, save_all=True, quality=animated_quality, loop=image.info.get("loop", 0))
+        else:
+            image.save(out, image_format, quality=quality)
+    return out.getvalue()
+
+
+def build_static_assets():
+    """Write the hashed, precompressed and transcoded copies of static/ and their manifest."""
+    import gzip
+    try:
+        import brotli
+    except ImportError:
+        print("brotli not installed, writing gzip variants only")
+        brotli = None
+
+    static_dir = app.static_folder
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and not (root == static_dir and d == STATIC_DIST))
+        for filename in sorted(files):
+            if filename.startswith("."):
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                data = f.read()
+
+            hashed = write_static_file(hashed_static_name(name, data), data)
+            entry = {"path": hashed}
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in STATIC_COMPRESSIBLE:
+                variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+                if brotli:
+                    variants[".br"] = brotli.compress(data, quality=11)
+                for suffix, compressed in variants.items():
+                    # Tiny files can come out larger; serve_static falls back to the plain file
+                    if len(compressed) < len(data):
+                        write_static_file(hashed + suffix, compressed)
+
+            sources = []
+            for image_format in STATIC_IMAGE_FORMATS.get(ext, ()):
+                variant_ext, mimetype = STATIC_IMAGE_TYPES[image_format][:2]
+                variant = hashed_static_name(name, data, variant_ext)
+                if not os.path.exists(os.path.join(static_dir, variant)):
+                    encoded = transcode_image(path, image_format)
+                    # Keep a modern format only if it actually beats the original
+                    if encoded is None or len(encoded) >= len(data):
+                        continue
+                    write_static_file(variant, encoded)
+                sources.append({"path": variant, "type": mimetype})
+            if sources:
+                entry["sources"] = sources
+            manifest[name] = entry
+
+    manifest_path = os.path.join(static_dir, STATIC_DIST, "manifest.json")
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+@app.cli.command("build-assets")
+@click.option("--clean", is_flag=True, help="Delete files from earlier builds that the new manifest does not use.")
+def build_assets_command(clean):
+    """Fingerprint, precompress and transcode static/ into static/dist/."""
+    manifest = build_static_assets()
+    dist_dir = os.path.join(app.static_folder, STATIC_DIST)
+    for name, entry in sorted(manifest.items()):
+        original = os.path.getsize(os.path.join(app.static_folder, name))
+        sizes = [f"{os.path.basename(entry['path'])} {original} B"]
+        for suffix in (".br", ".gz"):
+            if os.path.exists(os.path.join(app.static_folder, entry["path"] + suffix)):
+                sizes.append(f"{suffix[1:]} {os.path.getsize(os.path.join(app.static_folder, entry['path'] + suffix))} B")
+        for source in entry.get("sources", []):
+            sizes.append(f"{source['type']} {os.path.getsize(os.path.join(app.static_folder, source['path']))} B")
+        click.echo(f"{name:24} " + ", ".join(sizes))
+
+    if clean:
+        # Old hashed files are kept by default so pages rendered before a deploy can still load them
+        keep = {"manifest.json"}
+        for entry in manifest.values():
+            keep.update(os.path.relpath(os.path.join(app.static_folder, entry["path"] + suffix), dist_dir)
+                        for suffix in ("", ".br", ".gz"))
+            keep.update(os.path.relpath(os.path.join(app.static_folder, source["path"]), dist_dir)
+                        for source in entry.get("sources", []))
+        for root, _, files in os.walk(dist_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if os.path.relpath(path, dist_dir) not in keep:
+                    os.remove(path)
+                    click.echo(f"Removed {os.path.relpath(path, app.static_folder)}")
+
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    """url_for('static', filename='styles.css') -> /static/dist/styles.<hash>.css once assets are built."""
+    if endpoint == "static" and not app.debug:
+        entry = STATIC_MANIFEST.get(values.get("filename"))
+        if entry:
+            values["filename"] = entry["path"]
+
+
+@app.template_global()
+def static_sources(filename):
+    """(url, mimetype) for each modern-format copy of a static image, for <picture><source> tags."""
+    entry = {} if app.debug else STATIC_MANIFEST.get(filename, {})
+    return [(url_for("static", filename=source["path"]), source["type"]) for source in entry.get("sources", [])]
+
+
+def serve_static(filename):
+    """The static view: hashed files are cached forever and sent precompressed when accepted."""
+    if not filename.startswith(STATIC_DIST + "/"):
+        return app.send_static_file(filename)
+
+    compressible = filename.lower().endswith(STATIC_COMPRESSIBLE)
+    suffix = ""
+    encoding = None
+    if compressible:
+        for candidate, candidate_suffix in STATIC_ENCODINGS:
+            if request.accept_encodings[candidate] and os.path.isfile(os.path.join(app.static_folder, filename + candidate_suffix)):
+                encoding, suffix = candidate, candidate_suffix
+                break
+
+    response = send_from_directory(
+        app.static_folder, filename + suffix,
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        max_age=STATIC_IMMUTABLE_MAX_AGE,
+    )
+    response.cache_control.immutable = True
+    if compressible:
+        response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+app.view_functions["static"] = serve_static
+
+
+# Response compression
+# HTML, JSON, CSV and the other text responses are compressed on the way out
+# (brotli when the client accepts it and the module is installed, else gzip),
+# if they are at least COMPRESS_MIN_BYTES. Streamed responses (the CSV/NDJSON
+# exports) are compressed chunk by chunk as they are generated. File responses
+# (PDFs, ZIPs, uploads, static files, which send their own precompressed
+# variants) and anything already encoded are left alone. An empty
+# COMPRESS_MIMETYPES turns compression off.
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_MIMETYPES = {m.strip() for m in os.getenv(
+    "COMPRESS_MIMETYPES",
+    "text/html,text/plain,text/css,text/csv,application/json,application/x-ndjson,"
+    "application/javascript,text/javascript,image/svg+xml",
+).split(",") if m.strip()}
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+# Dynamic responses are compressed on every request: a low quality is nearly as small and far faster than 11
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+_brotli = None
+
+
+def load_brotli():
+    """The brotli module, or None if it is not installed."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            print("brotli not available, compressing responses with gzip only")
+            _brotli = False
+    return _brotli or None
+
+
+class ResponseCompressor:
+    """compress()/finish() over a brotli or gzip stream."""
+
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._stream = load_brotli().Compressor(quality=COMPRESS_BROTLI_QUALITY)
+            self.compress, self._finish = self._stream.process, self._stream.finish
+        else:
+            import zlib
+            # wbits 31: a gzip header and trailer around the deflate stream
+            self._stream = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.compress, self._finish = self._stream.compress, self._stream.flush
+
+    def finish(self):
+        return self._finish()
+
+
+def response_encoding():
+    """The best of br / gzip the request accepts, or None."""
+    candidates = [("br", request.accept_encodings["br"]), ("gzip", request.accept_encodings["gzip"])]
+    if load_brotli() is None:
+        candidates = candidates[1:]
+    encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if quality > 0 else None
+
+
+class CompressedBody:
+    """A streamed body, compressed as it is generated."""
+
+    def __init__(self, chunks, compressor):
+        self.chunks = chunks
+        self.compressor = compressor
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = self.compressor.compress(chunk)
+            if data:
+                yield data
+        yield self.compressor.finish()
+
+    def close(self):
+        # Closing the source runs stream_with_context's teardown, even if the body was never iterated
+        close = getattr(self.chunks, "close", None)
+        if close is not None:
+            close()
+
+
+@app.after_request
+def compress_response(response):
+    if (response.mimetype not in COMPRESS_MIMETYPES or response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or request.method == "HEAD" or "Content-Encoding" in response.headers
+            or response.cache_control.no_transform):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = response_encoding()
+    if encoding is None:
+        return response
+    if not response.is_streamed and (response.calculate_content_length() or 0) < COMPRESS_MIN_BYTES:
+        return response
+
+    compressor = ResponseCompressor(encoding)
+    if response.is_streamed:
+        response.response = CompressedBody(response.response, compressor)
+        response.headers.pop("Content-Length", None)
+    else:
+        response.set_data(compressor.compress(response.get_data()) + compressor.finish())
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes are a different representation of the same version
+    if response.get_etag()[0]:
+        response.set_etag(response.get_etag()[0], weak=True)
+    return response
+
 
 def insert_application(data, grade_report_path=None, optional_upload_path=None, activities=None):
     conn = get_connection()
@@ -183,6 +1293,7 @@ def insert_application(data, grade_report_path=None, optional_upload_path=None,
             len(activities.get('descs', []))
         )
 
+        rows = []
         for i in range(max_len):
             type_ = activities['types'][i] if i < len(activities['types']) else ''
             pos = activities['positions'][i] if i < len(activities['positions']) else ''
@@ -190,39 +1301,17 @@ def insert_application(data, grade_report_path=None, optional_upload_path=None,
             desc = activities['descs'][i] if i < len(activities['descs']) else ''
 
             if any([type_.strip(), pos.strip(), org.strip(), desc.strip()]):
-                cursor.execute("""
-                    INSERT INTO activities (application_id, activity_type, activity_position, activity_org, activity_desc)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    application_id,
-                    type_.strip(),
-                    pos.strip(),
-                    org.strip(),
-                    desc.strip()
-                ))
+                rows.append((None, type_.strip(), pos.strip(), org.strip(), desc.strip()))
+
+        sync_activities(conn, application_id, rows)
 
     conn.commit()
-    conn.close()
 
 
 @app.route('/')
 @login_required
 def index():
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute("SELECT * FROM applications WHERE user_id = %s ORDER BY id DESC LIMIT 1", (session["user_id"],))
-    application = cursor.fetchone()
-
-    activities = []
-    if application:
-        cursor.execute("""
-            SELECT activity_type, activity_position, activity_org, activity_desc
-            FROM activities WHERE application_id = %s
-        """, (application['id'],))
-        activities = cursor.fetchall()
-
-    conn.close()
+    application, activities = load_application(session["user_id"])
 
     if application and application.get("status") == "submitted":
         return redirect(url_for("dashboard"))
@@ -231,64 +1320,292 @@ def index():
 
 
 
+# Upload storage
+# Werkzeug writes each uploaded file straight into a temporary file in
+# UPLOAD_DIR (UploadSpool), hashing it, enforcing UPLOAD_MAX_BYTES and checking
+# its magic bytes as the chunks arrive. A file is then stored under its SHA-256
+# with a hard link, so the same report uploaded again (a resubmission, or a
+# sibling's application) is one file referenced by several rows. New uploads
+# get a first-page preview rendered by a small thread pool; `flask --app app
+# backfill-uploads` moves files saved before this into the store and renders
+# any previews that are missing.
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 5 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+PREVIEW_DIR = os.path.join(UPLOAD_DIR, "previews")
+PREVIEW_WIDTH = int(os.getenv("UPLOAD_PREVIEW_WIDTH", 320))
+UPLOAD_PREVIEW_WORKERS = int(os.getenv("UPLOAD_PREVIEW_WORKERS", 1))
+os.makedirs(PREVIEW_DIR, exist_ok=True)
+
+# kind -> (magic bytes, stored extension, content type)
+UPLOAD_TYPES = {
+    "pdf": (b"%PDF-", ".pdf", "application/pdf"),
+    "jpeg": (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    "png": (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    # Any ZIP starts like this; only accepted under a .docx name
+    "docx": (b"PK\x03\x04", ".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+}
+UPLOAD_SNIFF_BYTES = max(len(magic) for magic, _, _ in UPLOAD_TYPES.values())
+UPLOAD_FIELD_TYPES = {
+    "grade_report": ("pdf", "jpeg", "png"),
+    "upload": ("pdf", "jpeg", "png", "docx"),
+}
+
+
+class UnsupportedUpload(UnsupportedMediaType):
+    description = "Uploads must be a PDF, JPEG or PNG (the optional upload may also be a Word document)."
+
+
+def upload_kind(head, filename):
+    for kind, (magic, ext, _) in UPLOAD_TYPES.items():
+        if head.startswith(magic) and (kind != "docx" or (filename or "").lower().endswith(ext)):
+            return kind
+    return None
+
+
+class UploadSpool:
+    """The file werkzeug writes an uploaded part into while parsing the form."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, prefix=".incoming-")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.kind = None
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > UPLOAD_MAX_BYTES:
+            raise RequestEntityTooLarge()
+        if len(self.head) < UPLOAD_SNIFF_BYTES:
+            self.head += data[:UPLOAD_SNIFF_BYTES - len(self.head)]
+            if len(self.head) == UPLOAD_SNIFF_BYTES:
+                self.sniff()
+        self.sha256.update(data)
+        return self.file.write(data)
+
+    def sniff(self):
+        # Reject the upload as soon as its first bytes are known, not after reading all of it
+        self.kind = upload_kind(self.head, self.filename)
+        if self.kind is None:
+            raise UnsupportedUpload()
+
+    def seek(self, offset, whence=0):
+        # werkzeug rewinds the file once it has been written; files shorter than the magic are checked here
+        if self.kind is None and self.head:
+            self.sniff()
+        return self.file.seek(offset, whence)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSpool(filename)
+
+
+app.request_class = UploadRequest
+
+
+def store_upload(cursor, file, field):
+    """Store an uploaded file by content. Returns (path, sha256), or (None, None) if nothing was sent."""
+    if not file or not file.filename:
+        return None, None
+    if isinstance(file.stream, UploadSpool):
+        return store_spool(cursor, file.stream, field)
+    spool = UploadSpool(file.filename)
+    try:
+        shutil.copyfileobj(file.stream, spool, UPLOAD_CHUNK_SIZE)
+        return store_spool(cursor, spool, field)
+    finally:
+        spool.close()
+
+
+def store_spool(cursor, spool, field):
+    """Link a fully written UploadSpool into the store and record it. Returns (path, sha256)."""
+    spool.seek(0)
+    if spool.size == 0:
+        return None, None
+    if spool.kind not in UPLOAD_FIELD_TYPES[field]:
+        raise UnsupportedUpload()
+
+    digest = spool.sha256.hexdigest()
+    _, ext, content_type = UPLOAD_TYPES[spool.kind]
+    path = os.path.join(UPLOAD_DIR, digest + ext)
+    spool.flush()
+    os.fsync(spool.fileno())
+    try:
+        os.link(spool.name, path)
+        os.chmod(path, 0o644)
+    except FileExistsError:
+        pass  # same content already stored
+    cursor.execute("""
+        INSERT INTO uploads (sha256, path, content_type, size) VALUES (%s, %s, %s, %s)
+        ON CONFLICT (sha256) DO NOTHING
+    """, (digest, path, content_type, spool.size))
+    return path, digest
+
+
+def first_page_image(path, content_type):
+    """PIL image of an upload's first page, or None if it cannot be rasterised here."""
+    from PIL import Image
+
+    if content_type.startswith("image/"):
+        return Image.open(path)
+    if content_type != "application/pdf":
+        return None
+    if shutil.which("pdftoppm"):
+        import subprocess
+        png = subprocess.run(
+            ["pdftoppm", "-f", "1", "-l", "1", "-png", "-scale-to", str(PREVIEW_WIDTH * 2), path],
+            capture_output=True, timeout=30, check=True,
+        ).stdout
+        return Image.open(BytesIO(png))
+    # Without poppler: scanned reports are a single image per page, so show the largest one
+    from pypdf import PdfReader
+    images = [image.image for image in PdfReader(path).pages[0].images]
+    return max(images, key=lambda image: image.width * image.height) if images else None
+
+
+def generate_upload_preview(digest):
+    """Render and record previews/<sha256>.webp for an upload that has none yet."""
+    # No connection is held during the render (up to 30 s in pdftoppm): it
+    # would be one fewer for the requests this worker is serving
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT path, content_type FROM uploads WHERE sha256 = %s AND preview_path IS NULL", (digest,))
+        row = cursor.fetchone()
+        conn.commit()
+    if not row:
+        return None
+
+    preview_path = os.path.join(PREVIEW_DIR, f"{digest}.webp")
+    try:
+        image = first_page_image(*row)
+        if image is None:
+            return None
+        image.thumbnail((PREVIEW_WIDTH, PREVIEW_WIDTH * 2))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        # Two submissions of the same file can render its preview at once
+        tmp_path = f"{preview_path}.{uuid.uuid4().hex}.tmp"
+        image.save(tmp_path, "WEBP", quality=70)
+        os.replace(tmp_path, preview_path)
+    except Exception as e:
+        print(f"Upload preview failed ({row[0]}): {e}")
+        return None
+
+    with pooled_connection() as conn:
+        conn.cursor().execute("UPDATE uploads SET preview_path = %s WHERE sha256 = %s", (preview_path, digest))
+        conn.commit()
+    return preview_path
+
+
+_preview_executor = None
+_preview_executor_pid = None
+
+
+def get_preview_executor():
+    # One per gunicorn worker; uploads beyond UPLOAD_PREVIEW_WORKERS queue up
+    global _preview_executor, _preview_executor_pid
+    if _preview_executor is None or _preview_executor_pid != os.getpid():
+        _preview_executor = ThreadPoolExecutor(max_workers=max(UPLOAD_PREVIEW_WORKERS, 1),
+                                               thread_name_prefix="upload-preview")
+        _preview_executor_pid = os.getpid()
+    return _preview_executor
+
+
+def report_preview_failure(future):
+    if future.exception() is not None:
+        print(f"Upload preview failed: {future.exception()}")
+
+
+def start_upload_previews(digests):
+    for digest in digests:
+        if digest:
+            get_preview_executor().submit(generate_upload_preview, digest).add_done_callback(report_preview_failure)
+
+
+@app.cli.command("backfill-uploads")
+def backfill_uploads_command():
+    """Move uploads saved before content addressing into the store; render missing previews."""
+    moved = 0
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT path FROM (
+                SELECT grade_report_path AS path FROM applications
+                UNION SELECT upload_path FROM applications
+            ) p
+            WHERE path IS NOT NULL AND NOT EXISTS (SELECT 1 FROM uploads u WHERE u.path = p.path)
+        """)
+        for (old_path,) in cursor.fetchall():
+            if not os.path.isfile(old_path):
+                click.echo(f"Missing: {old_path}")
+                continue
+            spool = UploadSpool(old_path)
+            try:
+                with open(old_path, "rb") as f:
+                    shutil.copyfileobj(f, spool, UPLOAD_CHUNK_SIZE)
+                new_path, _ = store_spool(cursor, spool, "upload")
+            except (UnsupportedMediaType, RequestEntityTooLarge):
+                click.echo(f"Left in place (type or size not accepted for new uploads): {old_path}")
+                conn.rollback()
+                continue
+            finally:
+                spool.close()
+            cursor.execute("UPDATE applications SET grade_report_path = %s WHERE grade_report_path = %s", (new_path, old_path))
+            cursor.execute("UPDATE applications SET upload_path = %s WHERE upload_path = %s", (new_path, old_path))
+            conn.commit()
+            if new_path != old_path:
+                os.remove(old_path)
+            moved += 1
+
+        cursor.execute("SELECT sha256 FROM uploads WHERE preview_path IS NULL")
+        pending = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+
+    previews = sum(1 for digest in pending if generate_upload_preview(digest))
+    click.echo(f"Moved {moved} uploads into the store; rendered {previews} of {len(pending)} missing previews.")
+
+
+# Submission and autosave close at this time (ISO 8601). 12:20 AM WAT = 11:20 PM UTC
+SUBMISSION_DEADLINE = datetime.fromisoformat(os.getenv("SUBMISSION_DEADLINE", "2025-07-26T23:25:00+00:00"))
+
+
 @app.route('/submit', methods=['POST'])
 @login_required
 def submit():
 
      # Deadline check
-    deadline = datetime(2025, 7, 26, 23, 25, 0, tzinfo=timezone.utc)  # 12:20 AM WAT = 11:20 PM UTC
-    now = datetime.now(timezone.utc)
-
-    if now > deadline:
+    if datetime.now(timezone.utc) > SUBMISSION_DEADLINE:
         return redirect(url_for('submissions_closed'))  # or render_template("closed.html")
 
     conn = get_connection()
     cursor = conn.cursor()
     user_id = session["user_id"]
 
-    # Fetch latest application
-    cursor.execute("SELECT * FROM applications WHERE user_id = %s ORDER BY id DESC LIMIT 1", (user_id,))
-    app_row = cursor.fetchone()
+    # Buffered autosaves land before the submission, never after it
+    flush_pending_autosave(user_id)
+
+    # Fetch latest application (only its id is needed)
+    app_row, _ = load_application(user_id, columns=[], with_activities=False)
 
     if not app_row:
 
-        conn.close()
         return redirect(url_for("index"))
 
 
-    app_id = app_row[0]
+    app_id = app_row["id"]
 
     # Handle file uploads
 
-    grade_file = request.files.get('grade_report')
-    grade_path = None
-    if grade_file and grade_file.filename:
-
-        filename = f"{uuid.uuid4().hex}_{secure_filename(grade_file.filename)}"
-        grade_path = os.path.join(UPLOAD_DIR, filename)
-        grade_file.save(grade_path)
-
-    optional_file = request.files.get('upload')
-    optional_path = None
-    if optional_file and optional_file.filename:
-        filename = f"{uuid.uuid4().hex}_{secure_filename(optional_file.filename)}"
-        optional_path = os.path.join(UPLOAD_DIR, filename)
-        optional_file.save(optional_path)
+    grade_path, grade_digest = store_upload(cursor, request.files.get('grade_report'), "grade_report")
+    optional_path, optional_digest = store_upload(cursor, request.files.get('upload'), "upload")
 
     # Dynamic activities
-    activity_types = request.form.getlist('activity_type[]')
-    activity_positions = request.form.getlist('activity_position[]')
-    activity_orgs = request.form.getlist('activity_org[]')
-    activity_descs = request.form.getlist('activity_desc[]')
-
-    # Insert activities
-    cursor.execute("DELETE FROM activities WHERE application_id = %s", (app_id,))
-    for i in range(len(activity_types)):
-        if activity_types[i].strip():
-            cursor.execute("""
-                INSERT INTO activities (application_id, activity_type, activity_position, activity_org, activity_desc)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (app_id, activity_types[i], activity_positions[i], activity_orgs[i], activity_descs[i]))
+    sync_activities(conn, app_id, read_activity_rows(request.form))
 
     # Update application
     cursor.execute("""
@@ -352,43 +1669,41 @@ def submit():
 
     ))
 
-    conn.commit()
-    conn.close()
-
-    # Send confirmation email
+    # Confirmation email goes out through the outbox, committed with the submission
     student_name = request.form.get("student_name")
     user_email = request.form.get("email")
-    session["email"] = user_email
-    session["student_name"] = student_name
 
-    try:
-        msg = Message(
-            subject="PEAR Application Received!",
-            sender=app.config["MAIL_USERNAME"],
-            recipients=[user_email],
-            bcc=["admin@pearafrica.org"]
-        )
-        msg.body = f"""Dear {student_name},
+    queue_email(
+        cursor,
+        subject="PEAR Application Received!",
+        recipients=[user_email],
+        bcc=["admin@pearafrica.org"],
+        body=f"""Dear {student_name},
 
 Thank you for applying to the PEAR Summer Program!
 
 Your application has been received. We’ll be in touch once the review process is complete.
 
 Best,
-The PEAR Team"""
-
-        msg.html = f"""
+The PEAR Team""",
+        html=f"""
         <p>Dear {student_name},</p>
         <p>Thank you for applying to the <strong>PEAR Summer Program!</strong>.</p>
         <p>This email confirms that your application has been received. We’ll be in touch once the review process is complete.</p>
         <p>Best regards,<br>The PEAR Team</p>
         """
+    )
+
+    conn.commit()
+    invalidate_pdf_cache(app_id)
 
-        mail.send(msg)
-        print("📤 Sending confirmation email to", user_email)
+    # Start rendering the PDF the dashboard offers, so the download is ready
+    submitted_app, submitted_activities = load_application(user_id, app_id=app_id)
+    prerender_pdf(app_id, "submitted_pdf.html", app=submitted_app, activities=submitted_activities)
+    start_upload_previews([grade_digest, optional_digest])
 
-    except Exception as e:
-        print("Email failed to send:", e)
+    session["email"] = user_email
+    session["student_name"] = student_name
 
     print("✅ Submission complete, redirecting to dashboard")
     return redirect(url_for("dashboard"))
@@ -403,137 +1718,966 @@ def submissions_closed():
 
 
 
+# Conditional GET
+# The applicant's pages and PDFs are versioned by a cheap lookup (the
+# application's updated_at, kept by triggers on applications and activities,
+# plus the versions of what it is rendered with) done before any rendering.
+# A request whose If-None-Match already names that version gets a 304.
+STATIC_MANIFEST_VERSION = hashlib.sha256(json.dumps(STATIC_MANIFEST, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def version_etag(*parts):
+    """ETag for a response built from parts, or None when it must not be cached:
+    a pending flash message would be baked into a page that is otherwise unchanged."""
+    if session.get("_flashes"):
+        return None
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+def not_modified(etag):
+    """A 304 response if the request already holds this version, else None."""
+    # Weak comparison: a compressed response carries the same version as a weak ETag
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    response = with_etag(Response(status=304), etag)
+    # A 304 carries the Vary the full response would have (compress_response skips 304s)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def with_etag(response, etag):
+    response = make_response(response)
+    if etag is not None and response.status_code in (200, 304):
+        response.set_etag(etag)
+        # Per-user content: browsers may keep it, but must revalidate every time
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response
+
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    version, _ = load_application(session['user_id'], columns=["updated_at"], with_activities=False)
+    etag = version_etag("dashboard", session['user_id'], session.get("student_name"), version,
+                        template_version("dashboard.html"), STATIC_MANIFEST_VERSION)
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
-    # Get latest application
-    cursor.execute("SELECT * FROM applications WHERE user_id = %s ORDER BY id DESC LIMIT 1", (session['user_id'],))
-    application = cursor.fetchone()
+    # Get latest application and its activities
+    application, activities = load_application(session['user_id'])
 
-    # Fetch related activities
-    activities = []
-    if application:
-        cursor.execute("""
-            SELECT activity_type, activity_position, activity_org, activity_desc
-            FROM activities WHERE application_id = %s
-        """, (application['id'],))
-        activities = cursor.fetchall()
+    # Send both application and activities to the template
+    return with_etag(render_template('dashboard.html', application=application, activities=activities), etag)
 
-    conn.close()
 
-    # Send both application and activities to the template
-    return render_template('dashboard.html', application=application, activities=activities)
+# PDF engines
+# Each engine turns an HTML string into PDF bytes. The engine used for each
+# PDF template is set with PDF_ENGINE_SUBMITTED / PDF_ENGINE_RESPONSE /
+# PDF_ENGINE_LETTER; bench/pdf_engines.py measures both on the real templates.
+def render_with_xhtml2pdf(html):
+    from xhtml2pdf import pisa
+
+    pdf_io = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=pdf_io)
+    if pisa_status.err:
+        raise RuntimeError(f"xhtml2pdf reported {pisa_status.err} error(s)")
+    return pdf_io.getvalue()
+
+
+def render_with_weasyprint(html):
+    weasyprint = load_weasyprint()
+    if weasyprint is None:
+        raise RuntimeError("WeasyPrint is not installed")
+    return weasyprint.HTML(string=html, base_url=app.root_path).write_pdf()
+
+
+PDF_ENGINES = {
+    "xhtml2pdf": render_with_xhtml2pdf,
+    "weasyprint": render_with_weasyprint,
+}
+
+PDF_ENGINE_FOR_TEMPLATE = {
+    "submitted_pdf.html": os.getenv("PDF_ENGINE_SUBMITTED", "xhtml2pdf"),
+    "pdf_template.html": os.getenv("PDF_ENGINE_RESPONSE", "xhtml2pdf"),
+    "letter_pdf_template.html": os.getenv("PDF_ENGINE_LETTER", "xhtml2pdf"),
+}
+
+
+def pdf_engine_for(template_name):
+    """Engine name configured for a template, falling back to xhtml2pdf when the
+    configured one is unknown or not installed."""
+    engine = PDF_ENGINE_FOR_TEMPLATE.get(template_name, "xhtml2pdf")
+    if engine not in PDF_ENGINES or (engine == "weasyprint" and load_weasyprint() is None):
+        return "xhtml2pdf"
+    return engine
+
+
+def html_to_pdf(html, engine="xhtml2pdf"):
+    with timed("pdf"):
+        return PDF_ENGINES[engine](html)
+
+
+# Rendered PDF cache
+# Entries live under PDF_CACHE_DIR/<application id>/ and are named by a hash of
+# everything that goes into the render (template source, row, activities), so a
+# changed application can never be served a stale file. Least recently used
+# entries are evicted once the directory grows past PDF_CACHE_MAX_BYTES.
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "/mnt/data/pdf_cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+_template_versions = {}
+_pdf_cache_bytes = None
+
+
+def template_version(name):
+    """Short hash of a template's source; changes whenever the file is edited."""
+    path = os.path.join(app.root_path, app.template_folder, name)
+    mtime = os.path.getmtime(path)
+    cached = _template_versions.get(name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()[:16]
+    _template_versions[name] = (mtime, version)
+    return version
+
+
+def pdf_cache_key(template_name, **context):
+    payload = json.dumps(context, sort_keys=True, default=str)
+    digest = hashlib.sha256(
+        f"{template_name}:{template_version(template_name)}:{pdf_engine_for(template_name)}:{payload}".encode("utf-8"))
+    return f"{os.path.splitext(template_name)[0]}-{digest.hexdigest()}"
+
+
+def pdf_cache_get(app_id, key):
+    path = os.path.join(PDF_CACHE_DIR, str(app_id), f"{key}.pdf")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    os.utime(path)  # mtime doubles as last-used time for eviction
+    return data
+
+
+def pdf_cache_put(app_id, key, data):
+    global _pdf_cache_bytes
+    directory = os.path.join(PDF_CACHE_DIR, str(app_id))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{key}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, os.path.join(directory, f"{key}.pdf"))
+
+    if _pdf_cache_bytes is None:
+        evict_pdf_cache()
+    else:
+        _pdf_cache_bytes += len(data)
+        if _pdf_cache_bytes > PDF_CACHE_MAX_BYTES:
+            evict_pdf_cache()
+
+
+def evict_pdf_cache():
+    """Delete least recently used entries until the cache is under 90% of its limit."""
+    global _pdf_cache_bytes
+    entries = []
+    for directory, _, files in os.walk(PDF_CACHE_DIR):
+        for name in files:
+            if name.endswith(".pdf"):
+                path = os.path.join(directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total > PDF_CACHE_MAX_BYTES:
+        for _, size, path in sorted(entries):
+            if total <= PDF_CACHE_MAX_BYTES * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+    _pdf_cache_bytes = total
+
+
+def invalidate_pdf_cache(app_id):
+    shutil.rmtree(os.path.join(PDF_CACHE_DIR, str(app_id)), ignore_errors=True)
+
+
+def render_pdf_cached(app_id, template_name, **context):
+    """PDF bytes for template_name rendered with context, from the cache when possible.
+
+    Returns None if the PDF engine fails.
+    """
+    key = pdf_cache_key(template_name, **context)
+    data = pdf_cache_get(app_id, key)
+    if data is not None:
+        return data
+
+    pending = _pdf_prerenders.get(key)
+    if pending is not None:
+        try:
+            with timed("pdf"):
+                return pending.result(timeout=PDF_RENDER_TIMEOUT + 5)
+        except Exception as e:
+            print(f"PDF pre-render unavailable ({template_name}, application {app_id}): {e}; rendering now")
+
+    try:
+        data = html_to_pdf(render_template(template_name, **context), pdf_engine_for(template_name))
+    except Exception as e:
+        print(f"PDF generation error ({template_name}, application {app_id}): {e}")
+        return None
+
+    pdf_cache_put(app_id, key, data)
+    return data
 
 
 @app.route('/download_user_pdf/<int:app_id>')
 @login_required
 def download_user_pdf(app_id):
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    version, _ = load_application(session["user_id"], app_id=app_id, columns=["updated_at"], with_activities=False)
+    if not version:
+        return "Application not found.", 404
+
+    etag = version_etag("submitted_pdf", version, template_version("submitted_pdf.html"),
+                        pdf_engine_for("submitted_pdf.html"))
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
-    # Fetch application
-    cursor.execute("SELECT * FROM applications WHERE id = %s AND user_id = %s", (app_id, session["user_id"]))
-    app_data = cursor.fetchone()
+    # Fetch application with its activities
+    app_data, activities = load_application(session["user_id"], app_id=app_id)
 
     if not app_data:
-        conn.close()
         return "Application not found.", 404
 
-    # Fetch related activities
-    cursor.execute("SELECT * FROM activities WHERE application_id = %s", (app_id,))
-    activities = cursor.fetchall()
-
-    conn.close()
-
     # Render PDF with activities injected
-    rendered = render_template("submitted_pdf.html", app=app_data, activities=activities)
-    pdf = BytesIO()
-    pisa_status = pisa.CreatePDF(rendered, dest=pdf)
+    pdf_bytes = render_pdf_cached(app_id, "submitted_pdf.html", app=app_data, activities=activities)
 
-    if pisa_status.err:
+    if pdf_bytes is None:
         return "PDF generation error", 500
 
-    pdf.seek(0)
-    return send_file(pdf, mimetype='application/pdf', as_attachment=True,
-                     download_name='PEAR_Submitted_Application.pdf')
+    return with_etag(send_file(BytesIO(pdf_bytes), mimetype='application/pdf', as_attachment=True,
+                               download_name='PEAR_Submitted_Application.pdf', etag=False), etag)
 
 
-def generate_pdf(app, activities=[], grade_report_link=None, upload_link=None):
-    rendered = render_template("submitted_pdf.html", app=app, activities=activities, grade_report_link= grade_report_link, upload_link=upload_link)
-    pdf_io = BytesIO()
-    pisa_status = pisa.CreatePDF(rendered, dest=pdf_io)
-    pdf_io.seek(0)
-    return pdf_io if not pisa_status.err else None
+# Bulk PDF rendering
+# Templates are rendered in the request (they need the app context); the
+# HTML -> PDF conversion, which is where the time goes, runs in a process pool.
+# Per gunicorn worker, so keep these small: each render process holds a full interpreter
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", 2))
+PDF_PRERENDER_WORKERS = int(os.getenv("PDF_PRERENDER_WORKERS", 1))
+PDF_RENDER_TIMEOUT = int(os.getenv("PDF_RENDER_TIMEOUT", 60))
 
 
-@app.route("/admin/download_all_pdfs")
-def download_all_pdfs():
-    if not session.get("admin"):
-        return redirect(url_for("login"))
+def _raise_render_timeout(signum, frame):
+    raise TimeoutError("PDF render timed out")
 
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    cursor.execute("SELECT * FROM applications WHERE status = 'submitted'")
-    apps = cursor.fetchall()
+def render_pdf_job(html, timeout, engine="xhtml2pdf"):
+    """HTML -> PDF bytes inside a pool worker, interrupted after `timeout` seconds."""
+    if threading.current_thread() is not threading.main_thread():
+        # SIGALRM can only be armed from the main thread (in-process render from a
+        # request or export thread); the render runs without the timeout there
+        return html_to_pdf(html, engine)
+    signal.signal(signal.SIGALRM, _raise_render_timeout)
+    signal.alarm(timeout)
+    try:
+        return html_to_pdf(html, engine)
+    finally:
+        signal.alarm(0)
+
+
+class PdfRenderPool:
+    """Renders many documents in parallel and hands the results back in input order."""
+
+    def __init__(self, workers, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # Not fork: the web worker has threads running (autosave flusher, upload
+            # previews, export jobs), and a lock one of them holds at fork time
+            # stays held forever in the child
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(max_workers=max(self.workers, 1),
+                                                 mp_context=multiprocessing.get_context(method))
+        return self._executor
+
+    def submit(self, html, engine="xhtml2pdf"):
+        """Start rendering one document in the background; returns its Future."""
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            return self._get_executor().submit(render_pdf_job, html, self.timeout, engine)
+        except BrokenProcessPool:
+            self._executor = None
+            return self._get_executor().submit(render_pdf_job, html, self.timeout, engine)
+
+    def render_many(self, jobs, engine="xhtml2pdf"):
+        """Yield (key, pdf_bytes, error) for each (key, html) job, in order.
+        A job may pass PDF bytes instead of HTML when it is already rendered.
+
+        At most 2 * workers documents are in flight, so a long export holds a
+        bounded number of PDFs in memory. One failed or timed-out document
+        only costs that document.
+        """
+        if self.workers <= 1:
+            for key, html in jobs:
+                if isinstance(html, bytes):
+                    yield key, html, None
+                    continue
+                try:
+                    yield key, render_pdf_job(html, self.timeout, engine), None
+                except Exception as e:
+                    yield key, None, f"{type(e).__name__}: {e}"
+            return
+
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = self._get_executor()
+        pending = deque()
+        jobs = iter(jobs)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < 2 * self.workers:
+                try:
+                    key, html = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if isinstance(html, bytes):
+                    # Already rendered (cache hit); keeps its place in the output order
+                    future = Future()
+                    future.set_result(html)
+                else:
+                    future = executor.submit(render_pdf_job, html, self.timeout, engine)
+                pending.append((key, future))
+
+            if not pending:
+                break
+
+            key, future = pending.popleft()
+            try:
+                # The job interrupts itself after `timeout`; this is the backstop
+                yield key, future.result(timeout=self.timeout + 5), None
+            except BrokenProcessPool as e:
+                self._executor = None
+                yield key, None, f"Render worker crashed: {e}"
+            except FuturesTimeoutError:
+                yield key, None, f"TimeoutError: PDF render exceeded {self.timeout}s"
+            except Exception as e:
+                yield key, None, f"{type(e).__name__}: {e}"
+
+
+_pdf_render_pools = {}
+_pdf_render_pools_pid = None
+
+
+def get_pdf_render_pool(prerender=False):
+    # Like the DB pool, one per gunicorn worker process. Pre-renders get their
+    # own small pool, so a bulk export does not hold up applicants' PDFs
+    global _pdf_render_pools, _pdf_render_pools_pid
+    if _pdf_render_pools_pid != os.getpid():
+        _pdf_render_pools = {}
+        _pdf_render_pools_pid = os.getpid()
+    if prerender not in _pdf_render_pools:
+        workers = PDF_PRERENDER_WORKERS if prerender else PDF_RENDER_WORKERS
+        _pdf_render_pools[prerender] = PdfRenderPool(workers, PDF_RENDER_TIMEOUT)
+    return _pdf_render_pools[prerender]
+
+
+# Background pre-rendering
+# submit() hands the applicant's PDF to the pre-render pool as soon as the
+# application is committed, so the dashboard download is a cache hit. Renders
+# still in flight are tracked by cache key: a download that arrives first waits
+# for that render (see render_pdf_cached) instead of starting a second one.
+_pdf_prerenders = {}
+
+
+def prerender_pdf(app_id, template_name, **context):
+    """Render template_name into the PDF cache in the background, unless it is already there."""
+    key = pdf_cache_key(template_name, **context)
+    if key in _pdf_prerenders or os.path.exists(os.path.join(PDF_CACHE_DIR, str(app_id), f"{key}.pdf")):
+        return
+
+    try:
+        html = render_template(template_name, **context)
+        future = get_pdf_render_pool(prerender=True).submit(html, pdf_engine_for(template_name))
+    except Exception as e:
+        print(f"PDF pre-render not started ({template_name}, application {app_id}): {e}")
+        return
+
+    def store(done):
+        try:
+            pdf_cache_put(app_id, key, done.result())
+        except Exception as e:
+            print(f"PDF pre-render failed ({template_name}, application {app_id}): {e}")
+        finally:
+            _pdf_prerenders.pop(key, None)
+
+    _pdf_prerenders[key] = future
+    future.add_done_callback(store)
+
+
+# Cohort export jobs
+# POST /admin/exports builds a ZIP of every submitted application in a
+# background thread, writing it under EXPORT_DIR; GET /admin/exports/<id>
+# reports progress and /admin/exports/<id>/download serves the archive. Each
+# application is recorded with a fingerprint (its PDF cache key plus the size
+# and mtime of its uploads); applications whose fingerprint matches the
+# previous export are copied out of that archive instead of being rendered and
+# read from the upload directory again.
+EXPORT_DIR = os.getenv("EXPORT_DIR", "/mnt/data/exports")
+EXPORT_STALE_AFTER = int(os.getenv("EXPORT_STALE_AFTER", 300))
+EXPORT_PROGRESS_INTERVAL = 2
+os.makedirs(EXPORT_DIR, exist_ok=True)
+
+# Already-compressed formats are stored as they are; deflating them again only costs CPU
+STORED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".zip", ".docx", ".xlsx", ".pptx"}
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+def export_base_name(app):
+    name_part = app['student_name'].replace(' ', '_') if app.get('student_name') else f"unnamed_{app['id']}"
+    return f"{name_part}_application_{app['id']}"
+
+
+def export_uploads(app):
+    """(arcname, path) for each upload exported alongside an application's PDF."""
+    for column, suffix in (("grade_report_path", "grade_report"), ("upload_path", "optional_upload")):
+        path = app.get(column)
+        if path and os.path.exists(path):
+            yield f"{export_base_name(app)}_{suffix}{os.path.splitext(path)[1]}", path
+
+
+# Submitted applications with their activities, projected as load_application does
+EXPORT_COHORT_SQL = application_query() + " WHERE a.status = 'submitted' ORDER BY a.id"
+
+
+def export_pdf_context(row):
+    """submitted_pdf.html context for an EXPORT_COHORT_SQL row: exactly what
+    download_user_pdf renders with, so the two share PDF cache entries."""
+    activities = row.pop("activities")
+    return dict(app=row, activities=activities)
+
+
+def export_fingerprint(context):
+    uploads = []
+    for _, path in export_uploads(context["app"]):
+        st = os.stat(path)
+        uploads.append([path, st.st_size, st.st_mtime_ns])
+    payload = json.dumps([pdf_cache_key("submitted_pdf.html", **context), uploads])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def write_export_entry(zipf, arcname, source):
+    """Add bytes, a file path or an open binary file to zipf as arcname."""
+    from zipfile import ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+    info = ZipInfo(arcname, date_time=time.localtime()[:6])
+    info.compress_type = ZIP_STORED if os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS else ZIP_DEFLATED
+    with zipf.open(info, 'w', force_zip64=True) as dest:
+        if isinstance(source, bytes):
+            dest.write(source)
+        elif isinstance(source, str):
+            with open(source, 'rb') as src:
+                shutil.copyfileobj(src, dest, ZIP_CHUNK_SIZE)
+        else:
+            shutil.copyfileobj(source, dest, ZIP_CHUNK_SIZE)
 
-    zip_buffer = BytesIO()
 
-    with ZipFile(zip_buffer, 'w') as zipf:
-        for app in apps:
+def update_export_job(job_id, **fields):
+    assignments = "".join(f"{name} = %s, " for name in fields)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"UPDATE export_jobs SET {assignments}heartbeat_at = now() WHERE id = %s",
+                       (*fields.values(), job_id))
+        conn.commit()
+
+
+def build_export(job_id):
+    from zipfile import ZipFile
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            SELECT artifact_path, manifest FROM export_jobs
+            WHERE status = 'done' AND artifact_path IS NOT NULL ORDER BY id DESC LIMIT 1
+        """)
+        previous = cursor.fetchone()
+        cursor.execute("SELECT count(*) AS total FROM applications WHERE status = 'submitted'")
+        total = cursor.fetchone()["total"]
+        conn.commit()
+    update_export_job(job_id, total=total)
+
+    if previous and not os.path.exists(previous["artifact_path"]):
+        previous = None
+    previous_manifest = (previous["manifest"] or {}) if previous else {}
+    previous_zip = ZipFile(previous["artifact_path"]) if previous else None
+
+    artifact_path = os.path.join(EXPORT_DIR, f"export_{job_id}.zip")
+    tmp_path = f"{artifact_path}.tmp"
+    manifest = {}
+    failures = []
+    processed = reused = 0
+    last_progress = time.monotonic()
+
+    try:
+        with pooled_connection() as conn, ZipFile(tmp_path, 'w', allowZip64=True) as out:
+            # Server-side cursor: applications arrive in batches of itersize, with
+            # their activities aggregated in, instead of the whole cohort at once
+            cursor = conn.cursor(name=f"export_{job_id}", cursor_factory=RealDictCursor)
+            cursor.itersize = 50
+            cursor.execute(EXPORT_COHORT_SQL)
+
+            def render_jobs():
+                nonlocal processed
+                for row in cursor:
+                    context = export_pdf_context(row)
+                    app = context["app"]
+                    fingerprint = export_fingerprint(context)
+                    previous_entry = previous_manifest.get(str(app['id']))
+                    if previous_entry and previous_entry["fingerprint"] == fingerprint:
+                        # Unchanged since the last export: reuse its entries
+                        yield (app, fingerprint, None, previous_entry), previous_zip.read(previous_entry["entries"][0])
+                        continue
+                    cache_key = pdf_cache_key("submitted_pdf.html", **context)
+                    cached = pdf_cache_get(app['id'], cache_key)
+                    if cached is not None:
+                        yield (app, fingerprint, None, None), cached
+                        continue
+                    try:
+                        html = render_template("submitted_pdf.html", **context)
+                    except Exception as e:
+                        failures.append((app['id'], f"Template error: {type(e).__name__}: {e}"))
+                        # Never reaches the pool, so count it here or progress stops short of total
+                        processed += 1
+                        continue
+                    yield (app, fingerprint, cache_key, None), html
+
+            for (app, fingerprint, cache_key, previous_entry), pdf_bytes, error in get_pdf_render_pool().render_many(
+                    render_jobs(), engine=pdf_engine_for("submitted_pdf.html")):
+                entries = []
+                if error:
+                    failures.append((app['id'], error))
+                else:
+                    if cache_key:
+                        pdf_cache_put(app['id'], cache_key, pdf_bytes)
+                    entries.append(f"{export_base_name(app)}.pdf")
+                    write_export_entry(out, entries[0], pdf_bytes)
+
+                if previous_entry:
+                    for arcname in previous_entry["entries"][1:]:
+                        with previous_zip.open(arcname) as src:
+                            write_export_entry(out, arcname, src)
+                        entries.append(arcname)
+                    reused += 1
+                else:
+                    for arcname, path in export_uploads(app):
+                        write_export_entry(out, arcname, path)
+                        entries.append(arcname)
+
+                if not error:
+                    manifest[str(app['id'])] = {"fingerprint": fingerprint, "entries": entries}
+                processed += 1
+                if time.monotonic() - last_progress >= EXPORT_PROGRESS_INTERVAL:
+                    update_export_job(job_id, processed=processed, reused=reused, failed=len(failures))
+                    last_progress = time.monotonic()
+
+            cursor.close()
+
+            # Documents that could not be rendered are listed in the archive itself
+            if failures:
+                print(f"Export {job_id}: {len(failures)} application(s) failed to render")
+                report = "".join(f"application {app_id}: {error}\n" for app_id, error in failures)
+                write_export_entry(out, "export_errors.txt", report.encode("utf-8"))
+    finally:
+        if previous_zip:
+            previous_zip.close()
+
+    os.replace(tmp_path, artifact_path)
+    update_export_job(job_id, status="done", processed=processed, reused=reused, failed=len(failures),
+                      artifact_path=artifact_path, manifest=Json(manifest), finished_at=datetime.now(timezone.utc))
+
+    # Only the newest archive is kept; it is the base for the next export
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE export_jobs e SET artifact_path = NULL, manifest = NULL
+            FROM (SELECT id, artifact_path FROM export_jobs
+                  WHERE id < %s AND artifact_path IS NOT NULL FOR UPDATE) old
+            WHERE e.id = old.id RETURNING old.artifact_path
+        """, (job_id,))
+        old_paths = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    for path in old_paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    print(f"Export {job_id}: {processed} application(s), {reused} reused from the previous export")
+
+
+def run_export_job(job_id):
+    with app.app_context():
+        try:
+            build_export(job_id)
+        except Exception as e:
+            print(f"Export {job_id} failed: {e}")
+            update_export_job(job_id, status="failed", error=f"{type(e).__name__}: {e}",
+                              finished_at=datetime.now(timezone.utc))
             try:
-                name_part = app['student_name'].replace(' ', '_') if app.get('student_name') else f"unnamed_{app['id']}"
-                filename = f"{name_part}_application_{app['id']}.pdf"
-                base_name = f"{name_part}_application_{app['id']}"
+                os.remove(os.path.join(EXPORT_DIR, f"export_{job_id}.zip.tmp"))
+            except FileNotFoundError:
+                pass
+
+
+def start_export_job():
+    """Return (job id, started): the running export, or a new one started in the background."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    # A job whose worker died stops sending heartbeats; let a new one take its place
+    cursor.execute("""
+        UPDATE export_jobs SET status = 'failed', error = 'Abandoned: no progress', finished_at = now()
+        WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => %s)
+    """, (EXPORT_STALE_AFTER,))
+    cursor.execute("INSERT INTO export_jobs DEFAULT VALUES ON CONFLICT DO NOTHING RETURNING id")
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute("SELECT id FROM export_jobs WHERE status = 'running'")
+        row = cursor.fetchone()
+        conn.commit()
+        return row[0], False
+    conn.commit()
+
+    threading.Thread(target=run_export_job, args=(row[0],), name=f"export-{row[0]}", daemon=True).start()
+    return row[0], True
+
+
+def export_job_status(job_id):
+    cursor = get_connection().cursor(cursor_factory=RealDictCursor)
+    cursor.execute("""
+        SELECT id, status, total, processed, reused, failed, error, created_at, finished_at,
+               artifact_path IS NOT NULL AS has_artifact
+        FROM export_jobs WHERE id = %s
+    """, (job_id,))
+    job = cursor.fetchone()
+    if job is None:
+        return None
+    job["status_url"] = url_for("export_status", job_id=job_id)
+    if job.pop("has_artifact"):
+        job["download_url"] = url_for("download_export", job_id=job_id)
+    return job
+
 
+@app.route("/admin/exports", methods=["POST"])
+def start_export():
+    if not session.get("admin"):
+        return {"error": "Unauthorized"}, 403
+    job_id, started = start_export_job()
+    return jsonify(export_job_status(job_id)), 202 if started else 200
+
+
+@app.route("/admin/exports/<int:job_id>")
+def export_status(job_id):
+    if not session.get("admin"):
+        return {"error": "Unauthorized"}, 403
+    job = export_job_status(job_id)
+    if job is None:
+        return {"error": "Export not found"}, 404
+    return jsonify(job)
 
-                # Generate PDF into a BytesIO buffer
-                cursor.execute("SELECT * FROM activities WHERE application_id = %s", (app['id'],))
-                activities = cursor.fetchall()
+
+@app.route("/admin/exports/<int:job_id>/download")
+def download_export(job_id):
+    if not session.get("admin"):
+        return redirect(url_for("login"))
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT artifact_path FROM export_jobs WHERE id = %s AND status = 'done'", (job_id,))
+    row = cursor.fetchone()
+    if not row or not row[0] or not os.path.exists(row[0]):
+        return "Export not found.", 404
+    return send_protected_file(os.path.dirname(row[0]), os.path.basename(row[0]), "exports",
+                               mimetype='application/zip', as_attachment=True,
+                               download_name='all_applications.zip')
+
+
+
+# Columns the autosave endpoint may write
+AUTOSAVE_FIELDS = [
+    "student_name", "student_gender", "dob", "email", "phone", "grade",
+    "parent_name", "parent_contact", "school_name", "school_location", "school_contact",
+    "teacher_name", "teacher_contact", "teacher_email", "subjects", "interests",
+    "accommodation_required", "accommodation_comment",
+    "essay1", "essay2", "essay3", "optional_info"
+]
+
+
+def read_activity_rows(form):
+    """One (id, type, position, org, desc) tuple per activity block in the form,
+    or None for a block left without an activity type."""
+    ids = form.getlist('activity_id[]')
+    types = form.getlist('activity_type[]')
+    positions = form.getlist('activity_position[]')
+    orgs = form.getlist('activity_org[]')
+    descs = form.getlist('activity_desc[]')
+
+    rows = []
+    for i in range(len(types)):
+        if not types[i].strip():
+            rows.append(None)
+            continue
+        activity_id = ids[i] if i < len(ids) else ""
+        rows.append((
+            int(activity_id) if activity_id.isdigit() else None,
+            clean_input(types[i]),
+            clean_input(positions[i]) if i < len(positions) else "",
+            clean_input(orgs[i]) if i < len(orgs) else "",
+            clean_input(descs[i]) if i < len(descs) else "",
+        ))
+    return rows
+
+
+def sync_activities(conn, application_id, rows):
+    """Reconcile an application's stored activities with `rows` (see
+    read_activity_rows) using at most one INSERT, one UPDATE and one DELETE.
+
+    Rows carry the id of the activity they were loaded from; rows without one
+    are new. If no row carries an id at all (older pages, insert_application)
+    they are matched to the stored activities by position instead.
+    Runs in the caller's transaction. Returns (changed, ids) where ids lines
+    up with `rows`.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, activity_type, activity_position, activity_org, activity_desc
+        FROM activities WHERE application_id = %s ORDER BY id
+    """, (application_id,))
+    stored = {row[0]: tuple(v or "" for v in row[1:]) for row in cursor.fetchall()}
+
+    # Which stored activity each row overwrites (None = insert)
+    present = [row for row in rows if row is not None]
+    if present and all(row[0] is None for row in present):
+        by_position = iter(list(stored) + [None] * len(present))
+        matched = [next(by_position) if row is not None else None for row in rows]
+    else:
+        matched, claimed = [], set()
+        for row in rows:
+            if row is not None and row[0] in stored and row[0] not in claimed:
+                claimed.add(row[0])
+                matched.append(row[0])
+            else:
+                matched.append(None)
+
+    inserts = [(application_id,) + row[1:] for row, activity_id in zip(rows, matched)
+               if row is not None and activity_id is None]
+    updates = [(activity_id,) + row[1:] for row, activity_id in zip(rows, matched)
+               if activity_id is not None and stored[activity_id] != row[1:]]
+    deletes = [activity_id for activity_id in stored if activity_id not in matched]
+
+    new_ids = []
+    if inserts:
+        new_ids = [r[0] for r in execute_values(cursor, """
+            INSERT INTO activities (application_id, activity_type, activity_position, activity_org, activity_desc)
+            VALUES %s RETURNING id
+        """, inserts, fetch=True)]
+
+    if updates:
+        execute_values(cursor, """
+            UPDATE activities AS a SET
+                activity_type = v.activity_type,
+                activity_position = v.activity_position,
+                activity_org = v.activity_org,
+                activity_desc = v.activity_desc
+            FROM (VALUES %s) AS v (id, activity_type, activity_position, activity_org, activity_desc)
+            WHERE a.id = v.id
+        """, updates)
+
+    if deletes:
+        cursor.execute("DELETE FROM activities WHERE application_id = %s AND id = ANY(%s)",
+                       (application_id, deletes))
+
+    new_ids = iter(new_ids)
+    ids = [activity_id if activity_id is not None else (next(new_ids) if row is not None else None)
+           for row, activity_id in zip(rows, matched)]
+    return bool(inserts or updates or deletes), ids
+
+
+# Autosave write-behind buffer
+# A save that only touches application fields (the common case: typing an
+# essay) is merged into a per-user journal file under AUTOSAVE_JOURNAL_DIR and
+# confirmed straight away; the buffered draft reaches PostgreSQL at most
+# AUTOSAVE_FLUSH_INTERVAL seconds later, or sooner when the draft is read,
+# submitted, or the worker shuts down. The journal lives on the persistent disk
+# and is shared by all workers: each user's entry is guarded by a file lock,
+# and any worker's flusher can write any entry, including ones left behind by a
+# crashed worker. A flush never touches a submitted application. Activity
+# changes and new drafts are written through, since the client needs their ids.
+AUTOSAVE_JOURNAL_DIR = os.getenv("AUTOSAVE_JOURNAL_DIR", "/mnt/data/autosave_journal")
+AUTOSAVE_FLUSH_INTERVAL = float(os.getenv("AUTOSAVE_FLUSH_INTERVAL", 10))
+os.makedirs(AUTOSAVE_JOURNAL_DIR, exist_ok=True)
+
+AUTOSAVE_WRITES = Counter("portal_autosave_writes_total",
+                          "Autosaves by outcome: buffered, flushed, dropped (application submitted) or written through.")
+METRICS.append(AUTOSAVE_WRITES)
+
+_autosave_flusher_pid = None
+
+
+def autosave_journal_path(user_id):
+    return os.path.join(AUTOSAVE_JOURNAL_DIR, f"{int(user_id)}.json")
+
+
+@contextmanager
+def autosave_lock(user_id):
+    # The lock file is removed on release once the user has no buffered draft.
+    # Whoever was waiting on it then holds a lock on an unlinked file, so a
+    # lock only counts if the file is still the one at the path.
+    path = os.path.join(AUTOSAVE_JOURNAL_DIR, f"{int(user_id)}.lock")
+    while True:
+        lock_file = open(path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        lock_file.close()
+    try:
+        yield
+    finally:
+        try:
+            if not os.path.exists(autosave_journal_path(user_id)):
+                os.remove(path)
+        finally:
+            lock_file.close()
 
 
-                pdf_io = generate_pdf(app, activities)
+def read_autosave_entry(user_id):
+    try:
+        with open(autosave_journal_path(user_id)) as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    # Only ever write columns autosave is allowed to
+    entry["fields"] = {k: v for k, v in entry["fields"].items() if k in AUTOSAVE_FIELDS}
+    return entry
 
 
-                if pdf_io:
-                    zipf.writestr(filename, pdf_io.getvalue())
+def write_autosave_entry(user_id, entry):
+    path = autosave_journal_path(user_id)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entry, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
 
-                # Attach Grade Report file if exists
-                if app.get("grade_report_path") and os.path.exists(app["grade_report_path"]):
-                    ext = os.path.splitext(app["grade_report_path"])[1]
-                    zipf.write(app["grade_report_path"], arcname=f"{base_name}_grade_report{ext}")
 
-                # Attach Optional Upload if exists
-                if app.get("upload_path") and os.path.exists(app["upload_path"]):
-                    ext = os.path.splitext(app["upload_path"])[1]
-                    zipf.write(app["upload_path"], arcname=f"{base_name}_optional_upload{ext}")
+def has_uncommitted_writes(conn):
+    """Whether conn's open transaction has written anything (reads alone are safe to commit)."""
+    if conn.info.transaction_status == TRANSACTION_STATUS_IDLE:
+        return False
+    cursor = conn.cursor()
+    # A transaction only gets an id once it writes
+    cursor.execute("SELECT txid_current_if_assigned() IS NOT NULL")
+    return cursor.fetchone()[0]
+
+
+def flush_autosave_entry(user_id, entry):
+    """Write a buffered draft to its application. The caller holds the user's autosave lock."""
+    fields = entry["fields"]
+    # In a request, on the request's connection: a second one from the pool per
+    # request could exhaust it. The flush commits, so it must come before the
+    # request writes anything of its own.
+    with request_or_pooled_connection() as conn:
+        if has_uncommitted_writes(conn):
+            raise RuntimeError("Buffered autosave flushed after the request had started writing; "
+                               "flush_pending_autosave must run before the request's own writes")
+        cursor = conn.cursor()
+        set_clause = "".join(f"{k} = %s, " for k in fields)
+        cursor.execute(f"""
+            UPDATE applications SET {set_clause}revision = %s
+            WHERE id = %s AND revision = %s AND status IS DISTINCT FROM 'submitted'
+            RETURNING id
+        """, list(fields.values()) + [entry["revision"], entry["application_id"], entry["base_revision"]])
+        written = cursor.fetchone() is not None
+        conn.commit()
 
+    os.remove(autosave_journal_path(user_id))
+    if written:
+        invalidate_pdf_cache(entry["application_id"])
+        AUTOSAVE_WRITES.inc(outcome="flushed")
+    else:
+        AUTOSAVE_WRITES.inc(outcome="dropped")
+        print(f"Buffered autosave for application {entry['application_id']} dropped: "
+              "submitted or changed since it was buffered")
+
+
+def flush_pending_autosave(user_id):
+    """Make sure a user's buffered draft, if any, is in the database."""
+    if not os.path.exists(autosave_journal_path(user_id)):
+        return
+    with autosave_lock(user_id):
+        entry = read_autosave_entry(user_id)
+        if entry is not None:
+            flush_autosave_entry(user_id, entry)
+
+
+def flush_due_autosaves(max_age=0):
+    """Flush every buffered draft first buffered at least max_age seconds ago."""
+    for name in os.listdir(AUTOSAVE_JOURNAL_DIR):
+        if not name.endswith(".json"):
+            continue
+        user_id = int(name[:-len(".json")])
+        try:
+            with open(os.path.join(AUTOSAVE_JOURNAL_DIR, name)) as f:
+                buffered_at = json.load(f)["buffered_at"]
+        except (FileNotFoundError, ValueError, KeyError):
+            continue
+        if time.time() - buffered_at >= max_age:
+            try:
+                flush_pending_autosave(user_id)
             except Exception as e:
-                print(f"Skipping app ID {app['id']}: {e}")
+                print(f"Autosave flush failed for user {user_id}: {e}")
 
-    zip_buffer.seek(0)
 
-    return send_file(
-        zip_buffer,
-        mimetype='application/zip',
-        as_attachment=True,
-        download_name='all_applications.zip'
-    )
+def run_autosave_flusher():
+    while True:
+        time.sleep(AUTOSAVE_FLUSH_INTERVAL / 2)
+        flush_due_autosaves(AUTOSAVE_FLUSH_INTERVAL)
 
 
+@app.before_request
+def start_autosave_flusher():
+    # One flusher thread per worker process; it also picks up drafts a
+    # previous (crashed) worker left in the journal
+    global _autosave_flusher_pid
+    if AUTOSAVE_FLUSH_INTERVAL <= 0 or _autosave_flusher_pid == os.getpid():
+        return
+    _autosave_flusher_pid = os.getpid()
+    threading.Thread(target=run_autosave_flusher, name="autosave-flusher", daemon=True).start()
+    atexit.register(flush_due_autosaves)
+
 
 @app.route('/autosave', methods=['POST'])
 def autosave():
 
       # Deadline check
 
-    deadline = datetime(2025, 7, 26, 23, 25, 0, tzinfo=timezone.utc)  # 12:20 AM WAT = 11:20 PM UTC
-    now = datetime.now(timezone.utc)
-
-    if now > deadline:
+    if datetime.now(timezone.utc) > SUBMISSION_DEADLINE:
         return jsonify({"error": "The deadline has passed. Autosave is disabled."}), 403
 
 
@@ -544,90 +2688,113 @@ def autosave():
 
         return {"error": "Not logged in"}, 401
 
+    # PATCH-style: the client only sends the fields that changed since its last
+    # save, plus the revision it last saw. Activities are sent as a whole list
+    # (and only when one of them changed).
+    client_revision = request.form.get("revision", type=int)
+    data = {f: clean_input(request.form[f]) for f in AUTOSAVE_FIELDS if f in request.form}
+    activities_sent = 'activities_sent' in request.form or 'activity_type[]' in request.form
+    activity_rows = read_activity_rows(request.form) if activities_sent else []
 
+    with autosave_lock(user_id):
+        entry = read_autosave_entry(user_id)
+        if entry is not None and not activities_sent:
+            return buffer_autosave(user_id, entry, data, client_revision)
+        if entry is not None:
+            flush_autosave_entry(user_id, entry)
+        return write_autosave(user_id, data, client_revision, activities_sent, activity_rows)
 
-    fields = [
-        "student_name", "student_gender", "dob", "email", "phone", "grade",
-        "parent_name", "parent_contact", "school_name", "school_location", "school_contact",
-        "teacher_name", "teacher_contact", "teacher_email", "subjects", "interests",
-        "accommodation_required", "accommodation_comment",
-        "essay1", "essay2", "essay3", "optional_info"
-    ]
 
-    data = {f: clean_input(request.form.get(f, '')) for f in fields}
+def buffer_autosave(user_id, entry, data, client_revision):
+    """Merge a save into the user's buffered draft. The caller holds the autosave lock."""
+    if client_revision is not None and client_revision != entry["revision"]:
+        return {"error": "Draft was changed elsewhere. Reload to continue.",
+                "revision": entry["revision"]}, 409
 
-    # Get activity fields
-    activity_types = request.form.getlist('activity_type[]')
-    activity_positions = request.form.getlist('activity_position[]')
-    activity_orgs = request.form.getlist('activity_org[]')
-    activity_descs = request.form.getlist('activity_desc[]')
+    changed = {k: v for k, v in data.items() if entry["fields"].get(k) != v}
+    if not changed:
+        return {"success": True, "saved": False, "revision": entry["revision"], "activity_ids": []}
+
+    entry["fields"].update(changed)
+    entry["revision"] += 1
+    write_autosave_entry(user_id, entry)
+    AUTOSAVE_WRITES.inc(outcome="buffered")
+    return {"success": True, "saved": True, "revision": entry["revision"], "activity_ids": []}
 
-    conn = get_connection()
-    cursor = conn.cursor()
 
-    cursor.execute("SELECT id, status FROM applications WHERE user_id = %s ORDER BY id DESC LIMIT 1", (user_id,))
-    existing = cursor.fetchone()
+def write_autosave(user_id, data, client_revision, activities_sent, activity_rows):
+    """Autosave against the database (no buffered draft). The caller holds the autosave lock."""
+    activity_ids = []
 
+    conn = get_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
 
+    existing, _ = load_application(user_id, columns=["status", "revision"] + list(data.keys()),
+                                   with_activities=False)
 
     if existing:
-        app_id, status = existing
-        if status == "submitted":
-            conn.close()
+        app_id = existing["id"]
+        if existing["status"] == "submitted":
             return {"error": "Application already submitted"}, 403
 
-        # Update application
-        update_fields = ", ".join([f"{k} = %s" for k in data.keys()])
+        # Another tab (or an older page) saved since this client loaded the draft
+        if client_revision is not None and client_revision != existing["revision"]:
+            return {"error": "Draft was changed elsewhere. Reload to continue.",
+                    "revision": existing["revision"]}, 409
+
+        changed = {k: v for k, v in data.items() if (existing[k] or "") != v}
+
+        activities_changed = False
+        if activities_sent:
+            activities_changed, activity_ids = sync_activities(conn, app_id, activity_rows)
+
+        if not changed and not activities_changed:
+            return {"success": True, "saved": False, "revision": existing["revision"],
+                    "activity_ids": activity_ids}
+
+        if not activities_sent and AUTOSAVE_FLUSH_INTERVAL > 0:
+            revision = existing["revision"] + 1
+            write_autosave_entry(user_id, {
+                "application_id": app_id, "base_revision": existing["revision"], "revision": revision,
+                "fields": changed, "buffered_at": time.time(),
+            })
+            AUTOSAVE_WRITES.inc(outcome="buffered")
+            return {"success": True, "saved": True, "revision": revision, "activity_ids": []}
+
+        set_clause = "".join(f"{k} = %s, " for k in changed)
         cursor.execute(f"""
-            UPDATE applications SET {update_fields}
-            WHERE id = %s
-        """, list(data.values()) + [app_id])
-
-        # Overwrite activities
-        cursor.execute("DELETE FROM activities WHERE application_id = %s", (app_id,))
-        for i in range(len(activity_types)):
-            if activity_types[i].strip():
-                cursor.execute("""
-                    INSERT INTO activities (application_id, activity_type, activity_position, activity_org, activity_desc)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    app_id,
-                    clean_input(activity_types[i]),
-                    clean_input(activity_positions[i]),
-                    clean_input(activity_orgs[i]),
-                    clean_input(activity_descs[i])
-                ))
+            UPDATE applications SET {set_clause}revision = revision + 1
+            WHERE id = %s AND revision = %s AND status IS DISTINCT FROM 'submitted'
+            RETURNING revision
+        """, list(changed.values()) + [app_id, existing["revision"]])
+        updated = cursor.fetchone()
+        if not updated:
+            conn.rollback()
+            return {"error": "Draft was changed elsewhere. Reload to continue."}, 409
+        revision = updated["revision"]
 
     else:
         # New draft
-        fields_str = ", ".join(data.keys())
-        placeholders = ", ".join(["%s"] * len(data))
+        fields_str = "".join(f", {k}" for k in data.keys())
+        placeholders = "".join(", %s" for _ in data)
         cursor.execute(f"""
-            INSERT INTO applications (user_id, status, {fields_str})
-            VALUES (%s, 'incomplete', {placeholders})
-            RETURNING id
+            INSERT INTO applications (user_id, status, revision{fields_str})
+            VALUES (%s, 'incomplete', 1{placeholders})
+            RETURNING id, revision
         """, [user_id] + list(data.values()))
 
-        app_id = cursor.fetchone()[0]
+        inserted = cursor.fetchone()
+        app_id, revision = inserted["id"], inserted["revision"]
+        session["application_id"] = app_id
 
         # Insert new activities
-        for i in range(len(activity_types)):
-            if activity_types[i].strip():
-                cursor.execute("""
-                    INSERT INTO activities (application_id, activity_type, activity_position, activity_org, activity_desc)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    app_id,
-                    clean_input(activity_types[i]),
-                    clean_input(activity_positions[i]),
-                    clean_input(activity_orgs[i]),
-                    clean_input(activity_descs[i])
-                ))
+        _, activity_ids = sync_activities(conn, app_id, activity_rows)
 
     conn.commit()
-    conn.close()
+    invalidate_pdf_cache(app_id)
+    AUTOSAVE_WRITES.inc(outcome="written")
     print("✅ Autosave successful")
-    return {"success": True}
+    return {"success": True, "saved": True, "revision": revision, "activity_ids": activity_ids}
 
 
 
@@ -660,6 +2827,74 @@ def login():
 
 
 
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", 50))
+
+# Only what the admin table shows; essays and activities load on demand
+ADMIN_LIST_COLUMNS = [
+    "id", "student_name", "email", "phone", "grade",
+    "grade_report_path", "upload_path", "status", "review_status", "submitted_at",
+]
+
+
+def encode_page_cursor(row):
+    submitted_at = row["submitted_at"].isoformat() if row["submitted_at"] else ""
+    return f"{submitted_at}|{row['id']}"
+
+
+def decode_page_cursor(value):
+    # "<submitted_at iso or empty>|<id>" -> (submitted_at or None, id), or None if malformed
+    try:
+        submitted_at, app_id = value.rsplit("|", 1)
+        return (datetime.fromisoformat(submitted_at) if submitted_at else None), int(app_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def admin_filter_clause(args):
+    """SQL conditions and parameters for the admin views' status / review_status filters."""
+    clause, params = "", []
+
+    if args.get("status") in ["submitted", "incomplete"]:
+        clause += " AND status = %s"
+        params.append(args["status"])
+
+    if args.get("review_status") in ["accepted", "rejected", "waitlisted", "on_hold"]:
+        clause += " AND review_status = %s"
+        params.append(args["review_status"])
+
+    return clause, params
+
+
+def admin_list_query(args, after=None):
+    """The admin listing's SQL and parameters: one page (plus one row, to tell
+    whether there is a next page) after the decoded keyset cursor `after`."""
+    filters, filter_params = admin_filter_clause(args)
+    base = f"SELECT {', '.join(ADMIN_LIST_COLUMNS)} FROM applications WHERE 1=1{filters}"
+    order = " ORDER BY submitted_at DESC NULLS LAST, id DESC LIMIT %s"
+    limit = ADMIN_PAGE_SIZE + 1
+
+    # Keyset pagination on (submitted_at DESC NULLS LAST, id DESC)
+    if not after:
+        return base + order, tuple(filter_params + [limit])
+    last_submitted_at, last_id = after
+    if last_submitted_at is None:
+        return base + " AND submitted_at IS NULL AND id < %s" + order, tuple(filter_params + [last_id, limit])
+    # The rest of the dated rows, then the undated ones. As one condition joined by
+    # OR neither half can seek into the index, so each is its own branch.
+    query = (f"SELECT * FROM (({base} AND (submitted_at, id) < (%s, %s){order}) "
+             f"UNION ALL ({base} AND submitted_at IS NULL{order})) page{order}")
+    return query, tuple(filter_params + [last_submitted_at, last_id, limit] + filter_params + [limit, limit])
+
+
+ADMIN_ACTIVITY_COUNTS_SQL = """
+    SELECT application_id, COUNT(*) AS n FROM activities
+    WHERE application_id = ANY(%s) GROUP BY application_id
+"""
+ADMIN_UPLOAD_PREVIEWS_SQL = """
+    SELECT path, preview_path FROM uploads WHERE path = ANY(%s) AND preview_path IS NOT NULL
+"""
+
+
 # Admin route
 @app.route('/admin')
 def admin():
@@ -667,40 +2902,150 @@ def admin():
     if not session.get("admin"):
         return redirect(url_for("login"))
 
-    status_filter = request.args.get("status")
-    review_status_filter = request.args.get("review_status")
-
     conn = get_connection()
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Build dynamic query and parameters
-    query = "SELECT * FROM applications WHERE 1=1"
-    params = []
+    query, params = admin_list_query(request.args, decode_page_cursor(request.args.get("after")))
+    cursor.execute(query, params)
+    applications = cursor.fetchall()
 
-    if status_filter in ["submitted", "incomplete"]:
-        query += " AND status = %s"
-        params.append(status_filter)
+    next_cursor = None
+    if len(applications) > ADMIN_PAGE_SIZE:
+        applications = applications[:ADMIN_PAGE_SIZE]
+        next_cursor = encode_page_cursor(applications[-1])
 
-    if review_status_filter in ["accepted", "rejected", "waitlisted", "on_hold"]:
-        query += " AND review_status = %s"
-        params.append(review_status_filter)
+    # Activity counts for this page only
+    counts = {}
+    if applications:
+        cursor.execute(ADMIN_ACTIVITY_COUNTS_SQL, ([a['id'] for a in applications],))
+        counts = {r['application_id']: r['n'] for r in cursor.fetchall()}
 
-    query += " ORDER BY submitted_at DESC NULLS LAST, created_at DESC"
-    cursor.execute(query, tuple(params))
-    applications = cursor.fetchall()
+    # First-page previews of this page's uploads
+    previews = {}
+    paths = [a[column] for a in applications for column in ("grade_report_path", "upload_path") if a[column]]
+    if paths:
+        cursor.execute(ADMIN_UPLOAD_PREVIEWS_SQL, (paths,))
+        previews = {r['path']: r['preview_path'] for r in cursor.fetchall()}
 
-    # Get activities
-    cursor.execute("SELECT * FROM activities")
-    activities = cursor.fetchall()
+    for app in applications:
+        app['activity_count'] = counts.get(app['id'], 0)
+        app['grade_report_preview'] = previews.get(app['grade_report_path'])
+        app['upload_preview'] = previews.get(app['upload_path'])
+
+    return render_template('admin.html', rows=applications, next_cursor=next_cursor)
+
+
+# Data exports
+# /admin/export.csv and /admin/export.ndjson stream every application matching
+# the admin filters, with its activities, from a server-side cursor: rows are
+# fetched EXPORT_ITERSIZE at a time and written out as they arrive, so memory
+# stays flat however large the cohort is.
+EXPORT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", 500))
+EXPORT_COLUMNS = [
+    "id", "status", "review_status", "submitted_at", "created_at",
+    "student_name", "student_gender", "dob", "email", "phone", "grade",
+    "parent_name", "parent_contact", "school_name", "school_location", "school_contact",
+    "teacher_name", "teacher_contact", "teacher_email", "subjects", "interests",
+    "accommodation_required", "accommodation_comment",
+    "essay1", "essay2", "essay3", "optional_info", "grade_report_path", "upload_path",
+]
+ACTIVITY_EXPORT_FIELDS = ["activity_type", "activity_position", "activity_org", "activity_desc"]
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def export_query(args):
+    filters, params = admin_filter_clause(args)
+    return f"""
+        SELECT {', '.join('a.' + c for c in EXPORT_COLUMNS)}, COALESCE(act.activities, '[]') AS activities
+        FROM applications a {ACTIVITIES_JSON_JOIN}
+        WHERE 1=1{filters}
+        ORDER BY a.submitted_at DESC NULLS LAST, a.id DESC
+    """, params
+
+
+def iter_export_rows(args):
+    cursor = get_connection().cursor(name="export_applications", cursor_factory=RealDictCursor)
+    cursor.itersize = EXPORT_ITERSIZE
+    cursor.execute(*export_query(args))
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def csv_cell(value):
+    # Applicant text starting with one of these would run as a formula in a spreadsheet
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+def iter_csv_export(rows):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS + ["activity_count", "activities"])
+    for row in rows:
+        activities = row.pop("activities")
+        summary = "\n".join(" | ".join(a[f] or "" for f in ACTIVITY_EXPORT_FIELDS) for a in activities)
+        writer.writerow([csv_cell(row[c]) for c in EXPORT_COLUMNS] + [len(activities), csv_cell(summary)])
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson_export(rows):
+    chunk = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, default=str) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    yield "".join(chunk)
+
+
+@app.route("/admin/export.csv")
+def export_csv():
+    if not session.get("admin"):
+        return redirect(url_for("login"))
+    return Response(stream_timed(iter_csv_export(iter_export_rows(request.args))),
+                    mimetype="text/csv",
+                    headers={"Content-Disposition": "attachment; filename=applications.csv"})
 
-    act_map = defaultdict(list)
-    for a in activities:
-        act_map[a['application_id']].append(a)
 
-    for app in applications:
-        app['activities'] = act_map.get(app['id'], [])
+@app.route("/admin/export.ndjson")
+def export_ndjson():
+    if not session.get("admin"):
+        return redirect(url_for("login"))
+    return Response(stream_timed(iter_ndjson_export(iter_export_rows(request.args))),
+                    mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": "attachment; filename=applications.ndjson"})
 
-    return render_template('admin.html', rows=applications)
+
+@app.route("/admin/application/<int:app_id>")
+def admin_application_detail(app_id):
+    if not session.get("admin"):
+        return {"error": "Unauthorized"}, 403
+
+    conn = get_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+    cursor.execute("SELECT * FROM applications WHERE id = %s", (app_id,))
+    application = cursor.fetchone()
+    if not application:
+        return {"error": "Application not found"}, 404
+
+    cursor.execute("""
+        SELECT id, activity_type, activity_position, activity_org, activity_desc
+        FROM activities WHERE application_id = %s ORDER BY id
+    """, (app_id,))
+    application["activities"] = cursor.fetchall()
+
+    return jsonify(application)
 
 @app.route("/admin/update_review_status/<int:app_id>", methods=["POST"])
 def update_review_status(app_id):
@@ -718,34 +3063,115 @@ def update_review_status(app_id):
 
     cursor.execute("UPDATE applications SET review_status = %s WHERE id = %s", (new_status, app_id))
     conn.commit()
-    conn.close()
+    invalidate_pdf_cache(app_id)
     return redirect(url_for("admin", status=request.args.get("status")))
 
 
+# Most ids one bulk review request may update
+BULK_REVIEW_MAX_IDS = int(os.getenv("BULK_REVIEW_MAX_IDS", 500))
+
+
+@app.route("/admin/review_status", methods=["POST"])
+def bulk_update_review_status():
+    """Apply one review status to many applications: {"ids": [...], "status": "..."}."""
+    if not session.get("admin"):
+        return {"error": "Unauthorized"}, 403
+
+    payload = request.get_json(silent=True) or {}
+    new_status = payload.get("status")
+    ids = payload.get("ids")
+
+    if new_status not in ["accepted", "rejected", "waitlisted", "on_hold"]:
+        return {"error": "Invalid review status."}, 400
+    # bool is a subclass of int: true/false are not application ids
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return {"error": "ids must be a non-empty list of application ids."}, 400
+    if len(ids) > BULK_REVIEW_MAX_IDS:
+        return {"error": f"At most {BULK_REVIEW_MAX_IDS} ids per request."}, 400
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE applications SET review_status = %s WHERE id = ANY(%s) RETURNING id",
+                   (new_status, ids))
+    updated = sorted(row[0] for row in cursor.fetchall())
+    conn.commit()
+
+    for app_id in updated:
+        invalidate_pdf_cache(app_id)
+
+    return jsonify({
+        "success": True,
+        "status": new_status,
+        "updated": updated,
+        "not_found": sorted(set(ids) - set(updated)),
+    })
+
+
+@app.route("/admin/outbox_stats")
+def outbox_stats_view():
+    if not session.get("admin"):
+        return redirect(url_for("login"))
+    return jsonify(outbox_stats())
+
+
+@app.route("/admin/metrics")
+def metrics_view():
+    # Admin session, or "Authorization: Bearer $METRICS_TOKEN" for a Prometheus scraper
+    authorization = request.headers.get("Authorization", "")
+    if not session.get("admin") and not (
+            METRICS_TOKEN and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")):
+        return {"error": "Unauthorized"}, 403
+    # Per gunicorn worker, like pool_stats
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route("/admin/pool_stats")
+def pool_stats():
+    if not session.get("admin"):
+        return redirect(url_for("login"))
+    # Stats are per gunicorn worker; the pid tells them apart
+    return jsonify(get_pool().stats())
+
+
 @app.route('/admin/pdf/<int:app_id>')
 def download_response_pdf(app_id):
+    # The applicant's "Download Draft" should include what they typed a moment ago
+    if session.get("user_id"):
+        flush_pending_autosave(session["user_id"])
+
     conn = get_connection()
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
+    cursor.execute("SELECT updated_at FROM applications WHERE id = %s", (app_id,))
+    version = cursor.fetchone()
+    if not version:
+        return "Application not found", 404
+
+    etag = version_etag("response_pdf", app_id, version["updated_at"], request.url_root,
+                        template_version("pdf_template.html"), pdf_engine_for("pdf_template.html"))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     cursor.execute("SELECT * FROM applications WHERE id = %s", (app_id,))
     application = cursor.fetchone()
 
     if not application:
-        conn.close()
         return "Application not found", 404
 
-    cursor.execute("SELECT * FROM activities WHERE application_id = %s", (app_id,))
+    cursor.execute(ACTIVITIES_FOR_APPLICATION_SQL, (app_id,))
     activities = cursor.fetchall()
-    conn.close()
 
-    html = render_template('pdf_template.html', app_data=application, activities=activities, request=request)
-    result = BytesIO()
-    pisa.CreatePDF(html, dest=result)
+    # The template builds upload links from request.url_root, so it is part of the key
+    pdf_bytes = render_pdf_cached(app_id, 'pdf_template.html', app_data=application, activities=activities,
+                                  url_root=request.url_root)
+    if pdf_bytes is None:
+        return "PDF generation error", 500
 
-    response = make_response(result.getvalue())
+    response = make_response(pdf_bytes)
     response.headers['Content-Type'] = 'application/pdf'
     response.headers['Content-Disposition'] = f'attachment; filename=application_{app_id}.pdf'
-    return response
+    return with_etag(response, etag)
 
 @app.route('/login_user', methods=['GET', 'POST'])
 def login_user():
@@ -755,12 +3181,12 @@ def login_user():
 
         conn = get_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+        cursor.execute(USER_BY_EMAIL_SQL, (email,))
         user = cursor.fetchone()
-        conn.close()
 
         if user and check_password_hash(user['password_hash'], password):
             session['user_id'] = user['id']
+            session.pop('application_id', None)
             session['email'] = user['email']
             session['student_name'] = user['student_name']
             return redirect(url_for('dashboard'))  # Go to dashboard
@@ -785,36 +3211,27 @@ def logout_user_dashboard():
 # Token Serializer
 serializer = URLSafeTimedSerializer(app.secret_key)
 
-# DB connection
+# DB connection (same request-scoped pooled connection as get_connection)
 def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST"),
-        cursor_factory=psycopg2.extras.RealDictCursor
-    )
+    return get_connection()
 
 @app.route('/forgot_password', methods=['GET', 'POST'])
 def forgot_password():
     if request.method == 'POST':
         email = request.form['email']
         conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM users WHERE email = %s", (email,))
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(USER_BY_EMAIL_SQL, (email,))
         user = cur.fetchone()
         cur.close()
-        conn.close()
 
         if user:
             token = serializer.dumps(email, salt='password-reset')
             link = url_for('reset_password', token=token, _external=True)
 
-            msg = Message( subject="Reset your password", recipients=[email],  sender=app.config["MAIL_USERNAME"])
-
-
-            msg.body = f"Click here to reset your password: {link}"
-            mail.send(msg)
+            queue_email(conn.cursor(), subject="Reset your password", recipients=[email],
+                        body=f"Click here to reset your password: {link}")
+            conn.commit()
             flash("Reset link sent to your email.", "info")
         else:
             flash("Email not found.", "error")
@@ -834,11 +3251,10 @@ def reset_password(token):
         hashed = generate_password_hash(new_password)
 
         conn = get_db_connection()
-        cur = conn.cursor()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
         cur.execute("UPDATE users SET password_hash = %s WHERE email = %s", (hashed, email))
         conn.commit()
         cur.close()
-        conn.close()
 
         flash("Your password has been reset! Please log in.", "success")
         return redirect(url_for('login_user'))
@@ -849,7 +3265,14 @@ def reset_password(token):
 def serve_uploaded_file(filename):
     if not session.get("admin"):
         return "Unauthorized", 403
-    return send_from_directory(UPLOAD_DIR, filename)
+    return send_protected_file(UPLOAD_DIR, filename, "uploads")
+
+
+@app.route('/uploads/previews/<filename>')
+def serve_upload_preview(filename):
+    if not session.get("admin"):
+        return "Unauthorized", 403
+    return send_protected_file(PREVIEW_DIR, filename, "uploads/previews")
 
 @app.route('/view_status/<int:application_id>')
 @login_required
@@ -858,39 +3281,43 @@ def view_status(application_id):
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     # Only show the application if it belongs to the logged-in user
-    cursor.execute("SELECT student_name, review_status FROM applications WHERE id = %s AND user_id = %s", (application_id, session["user_id"]))
+    cursor.execute("SELECT student_name, review_status, updated_at FROM applications WHERE id = %s AND user_id = %s", (application_id, session["user_id"]))
     result = cursor.fetchone()
 
     if not result:
-        conn.close()
         return "Applicant not found", 404
 
     student_name = result["student_name"]
     review_status = result["review_status"]
 
+    # Applicants reload this page while they wait for a decision; the letter text comes from the per-worker cache
+    etag = version_etag("view_status", application_id, result["updated_at"], get_letter_content(review_status),
+                        template_version("view_status.html"), STATIC_MANIFEST_VERSION)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
      # Construct letter filename: match format like "acceptance_letter_David Oluwafikunayomi Ogunbe.pdf"
     letter_filename = None
     if review_status == 'accepted':
         letter_filename = f"acceptance_letter_{student_name}.pdf"
 
     #Get the matching letter from letters table
-    cursor.execute("SELECT content FROM letters WHERE status = %s", (review_status,))
-    letter = cursor.fetchone()
-    conn.close()
+    letter_content = get_letter_content(review_status)
 
-    if not letter:
+    if not letter_content:
         return f"No letter found for status '{review_status}'", 404
 
-    letter_content = letter["content"].replace("{{ student_name }}", student_name)
+    letter_content = letter_content.replace("{{ student_name }}", student_name)
 
 
-    return render_template(
+    return with_etag(render_template(
         'view_status.html',
         student_name=student_name,
         letter_content=letter_content,
         applicant_id=application_id,
         review_status=review_status
-    )
+    ), etag)
 
 
 def image_to_base64(image_path):
@@ -906,6 +3333,85 @@ def image_to_base64(image_path):
         return None
 
 
+# Letter images are read and base64-encoded once per worker, then reused until
+# the file on disk changes
+_letter_images = {}
+
+
+def cached_image_base64(image_path):
+    try:
+        mtime = os.path.getmtime(image_path)
+    except OSError:
+        mtime = None  # missing; image_to_base64 reports it
+
+    cached = _letter_images.get(image_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    encoded = image_to_base64(image_path) if mtime is not None else None
+    if mtime is None and cached is None:
+        print(f"Image not found: {image_path}")
+    _letter_images[image_path] = (mtime, encoded)
+    return encoded
+
+
+LETTER_IMAGES = {
+    "header_base64": "pear_header.png",
+    "watermark_base64": "pear_watermark.png",
+    "signature_base64": "pear_signature.png",
+    "footer_base64": "pear_footer.png",
+}
+
+
+def letter_images():
+    static_dir = os.path.join(app.root_path, 'static')
+    return {key: cached_image_base64(os.path.join(static_dir, name)) for key, name in LETTER_IMAGES.items()}
+
+
+def letter_images_version():
+    """mtimes of the letter images, for the letter's ETag."""
+    static_dir = os.path.join(app.root_path, 'static')
+    versions = []
+    for name in LETTER_IMAGES.values():
+        try:
+            versions.append(os.path.getmtime(os.path.join(static_dir, name)))
+        except OSError:
+            versions.append(None)
+    return versions
+
+
+# Letter templates by review status. The table is a handful of rows that only
+# change by hand, so each worker keeps a copy; invalidate_letters_cache() (or
+# POST /admin/letters/reload) drops it, and LETTERS_CACHE_TTL bounds how long
+# another worker can keep serving an old copy.
+LETTERS_CACHE_TTL = int(os.getenv("LETTERS_CACHE_TTL", 300))
+_letters_cache = None
+_letters_loaded_at = 0.0
+
+
+def get_letter_content(status):
+    global _letters_cache, _letters_loaded_at
+    if _letters_cache is None or time.monotonic() - _letters_loaded_at > LETTERS_CACHE_TTL:
+        cursor = get_connection().cursor(cursor_factory=RealDictCursor)
+        cursor.execute("SELECT status, content FROM letters")
+        _letters_cache = {row["status"]: row["content"] for row in cursor.fetchall()}
+        _letters_loaded_at = time.monotonic()
+    return _letters_cache.get(status)
+
+
+def invalidate_letters_cache():
+    global _letters_cache
+    _letters_cache = None
+
+
+@app.route("/admin/letters/reload", methods=["POST"])
+def reload_letters():
+    if not session.get("admin"):
+        return redirect(url_for("login"))
+    invalidate_letters_cache()
+    return {"success": True}
+
+
 # Dynamic Letter Download
 @app.route('/download_letter/<int:application_id>')
 @login_required
@@ -914,65 +3420,58 @@ def download_letter(application_id):
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     # Fetch student name and review status for this application
-    cursor.execute("SELECT student_name, review_status FROM applications WHERE id = %s AND user_id = %s", (application_id, session["user_id"]))
+    cursor.execute("SELECT student_name, review_status, updated_at FROM applications WHERE id = %s AND user_id = %s", (application_id, session["user_id"]))
     result = cursor.fetchone()
 
     if not result:
-        conn.close()
         return "Applicant not found", 404
 
     student_name = result["student_name"]
     review_status = result["review_status"]
 
     # Fetch letter template/content for this review status
-    cursor.execute("SELECT content FROM letters WHERE status = %s", (review_status,))
-    letter = cursor.fetchone()
-    conn.close()
-
-    if not letter:
+    letter_content = get_letter_content(review_status)
+
+    # The letter is dated, so it is a new version every day
+    today = datetime.now().strftime("%B %d, %Y")
+    etag = version_etag("letter", application_id, result["updated_at"], letter_content, today,
+                        template_version("letter_pdf_template.html"), pdf_engine_for("letter_pdf_template.html"),
+                        letter_images_version())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if not letter_content:
         return f"No letter found for status '{review_status}'", 404
 
     # Replace placeholder in letter content
-    content = letter["content"].replace("{{ student_name }}", student_name)
-
-    # Convert images to base64 (adjust paths to your actual image locations)
-    static_dir = os.path.join(app.root_path, 'static')
-
-    header_base64 = image_to_base64(os.path.join(static_dir, 'pear_header.png'))
-    watermark_base64 = image_to_base64(os.path.join(static_dir, 'pear_watermark.png'))
-    signature_base64 = image_to_base64(os.path.join(static_dir, 'pear_signature.png'))
-    footer_base64 = image_to_base64(os.path.join(static_dir, 'pear_footer.png'))
+    content = letter_content.replace("{{ student_name }}", student_name)
 
-    # Render HTML template
+    # Render HTML template (images are pre-encoded per worker)
     html_content = render_template(
         "letter_pdf_template.html",
         content=content,
         student_name=student_name,
         review_status=review_status,
-        today=datetime.now().strftime("%B %d, %Y"),
-        header_base64=header_base64,
-        watermark_base64=watermark_base64,
-        signature_base64=signature_base64,
-        footer_base64=footer_base64
+        today=today,
+        **letter_images()
     )
 
-    # Generate PDF using xhtml2pdf (same as your other PDF functions)
-    pdf_buffer = BytesIO()
-    pisa_status = pisa.CreatePDF(html_content, dest=pdf_buffer)
-
-    if pisa_status.err:
-        print(f"PDF generation error: {pisa_status.err}")
+    # Generate PDF with the engine configured for letters
+    try:
+        pdf_buffer = BytesIO(html_to_pdf(html_content, pdf_engine_for("letter_pdf_template.html")))
+    except Exception as e:
+        print(f"PDF generation error: {e}")
         return "PDF generation failed", 500
 
-    pdf_buffer.seek(0)
     filename = f"{review_status.lower()}_letter_{student_name.replace(' ', '_')}.pdf"
 
-    return send_file(
+    return with_etag(send_file(
         pdf_buffer,
         mimetype='application/pdf',
         as_attachment=True,
         download_name=filename
-    )
+    ), etag)
 
 
 
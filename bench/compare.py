@@ -0,0 +1,81 @@
+"""Compare two bench/load.py reports.
+
+    python bench/compare.py baseline.json candidate.json [--threshold 10]
+
+Prints the change in throughput and p50/p95/p99 for every scenario in both
+reports, and in export times. Exits with status 1 if any scenario's p95 or an
+export time got worse, or its throughput dropped, by more than --threshold
+percent, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def format_change(pct):
+    return "n/a" if pct is None else f"{pct:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed regression, in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+
+    print(f"baseline  {old.get('commit')}{' (dirty)' if old.get('dirty') else ''}  {old.get('cohort')}")
+    print(f"candidate {new.get('commit')}{' (dirty)' if new.get('dirty') else ''}  {new.get('cohort')}")
+    for key in ("cohort", "settings", "target"):
+        if old.get(key) != new.get(key):
+            print(f"warning: {key} differs between the reports; the comparison is only indicative")
+
+    regressions = []
+    print(f"\n{'scenario':12} {'req/s':>16} {'p50':>16} {'p95':>16} {'p99':>16}")
+    for scenario in old.get("scenarios", {}):
+        if scenario not in new.get("scenarios", {}):
+            continue
+        a, b = old["scenarios"][scenario], new["scenarios"][scenario]
+        cells = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{b[metric]!s} ({format_change(change(a[metric], b[metric]))})")
+        print(f"{scenario:12} " + " ".join(f"{cell:>16}" for cell in cells))
+
+        throughput = change(a["throughput_rps"], b["throughput_rps"])
+        p95 = change(a["p95_ms"], b["p95_ms"])
+        if throughput is not None and throughput < -args.threshold:
+            regressions.append(f"{scenario}: throughput {format_change(throughput)}")
+        if p95 is not None and p95 > args.threshold:
+            regressions.append(f"{scenario}: p95 {format_change(p95)}")
+        if b["errors"] > a["errors"]:
+            regressions.append(f"{scenario}: errors {a['errors']} -> {b['errors']}")
+
+    if old.get("export") and new.get("export"):
+        print()
+        for run in ("cold", "repeat", "after_changes"):
+            key = f"{run}_s"
+            pct = change(old["export"].get(key), new["export"].get(key))
+            print(f"export {run:14} {old['export'].get(key)}s -> {new['export'].get(key)}s ({format_change(pct)})")
+            if pct is not None and pct > args.threshold:
+                regressions.append(f"export {run}: {format_change(pct)}")
+
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold}%:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""Load-test the hot routes against a seeded database and write a JSON report.
+
+    DB_NAME=pear_bench python bench/seed.py --scale 10000
+    DB_NAME=pear_bench python bench/load.py --report bench-10k.json
+    python bench/compare.py bench-before.json bench-10k.json
+
+By default requests go through Flask's test client in this process (no server
+needed; numbers are comparable between commits on the same machine). With
+--url they go over HTTP to a running server, e.g. gunicorn started with the
+same DB_* settings and SUBMISSION_DEADLINE in the future.
+
+Each scenario runs `concurrency` virtual users for --warmup + --duration
+seconds; only requests finished after the warm-up are counted. Reported per
+scenario: requests, errors, throughput and p50/p95/p99/mean/max latency. The
+export scenario instead times whole cohort exports (cold, repeated, and after a
+few review decisions); it clears the export history and PDF cache first.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seeded applicants must still be able to autosave and submit, and PDF renders
+# under load would otherwise fill the output with slow-request lines
+os.environ.setdefault("SUBMISSION_DEADLINE", "2100-01-01T00:00:00+00:00")
+os.environ.setdefault("SLOW_REQUEST_MS", "60000")
+
+import app as portal  # noqa: E402
+from seed import BENCH_EMAIL_DOMAIN, BENCH_PASSWORD  # noqa: E402
+
+SCENARIOS = ["autosave", "submit", "dashboard", "admin", "pdf_user", "pdf_admin", "letter", "export"]
+
+
+class InProcessClient:
+    def __init__(self):
+        self.client = portal.app.test_client()
+
+    def request(self, method, path, data=None, json_body=None):
+        response = self.client.open(path, method=method, data=data, json=json_body)
+        return response.status_code, response.headers, response.get_data()
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(), NoRedirect())
+
+    def request(self, method, path, data=None, json_body=None):
+        body, headers = None, {}
+        if data is not None:
+            body = urlencode(data, doseq=True).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with self.opener.open(req, timeout=300) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+
+# Virtual users
+
+def bench_identities(status, limit, offset=0):
+    """(email, application id) of seeded applicants whose application has `status`."""
+    with portal.pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT u.email, a.id FROM users u JOIN applications a ON a.user_id = u.id
+            WHERE a.status = %s AND u.email LIKE %s
+            ORDER BY a.id LIMIT %s OFFSET %s
+        """, (status, f"%@{BENCH_EMAIL_DOMAIN}", limit, offset))
+        return cursor.fetchall()
+
+
+def login_applicant(client, email):
+    status, _, _ = client.request("POST", "/login_user", data={"email": email, "password": BENCH_PASSWORD})
+    if status != 302:
+        raise RuntimeError(f"Login failed for {email} (HTTP {status})")
+
+
+def login_admin(client, email, password):
+    status, _, _ = client.request("POST", "/login", data={"email": email, "password": password})
+    if status != 302:
+        raise RuntimeError(f"Admin login failed (HTTP {status}); set ADMIN_EMAIL_1 / ADMIN_PASS_1")
+
+
+def submit_form(n):
+    return {
+        "student_name": f"Bench Applicant {n}", "student_gender": "Female", "dob": "2008-03-14",
+        "email": f"submit{n}@{BENCH_EMAIL_DOMAIN}", "phone": "+234 800 000 0000", "grade": "11",
+        "parent_name": "Parent", "parent_contact": "+234 800 111 0000",
+        "school_name": "Bench School", "school_location": "Lagos", "school_contact": "+234 800 222 0000",
+        "teacher_name": "Teacher", "teacher_contact": "+234 800 333 0000", "teacher_email": "t@school.invalid",
+        "subjects": "Physics", "interests": "Energy", "accommodation_required": "No",
+        "accommodation_comment": "", "essay1": "Essay one. " * 150, "essay2": "Essay two. " * 150,
+        "essay3": "Essay three. " * 150, "optional_info": "",
+        "activity_type[]": ["Club", "Sport"], "activity_position[]": ["President", "Captain"],
+        "activity_org[]": ["Science Club", "Football"], "activity_desc[]": ["Weekly experiments.", "Training."],
+    }
+
+
+class VirtualUser:
+    """One logged-in client driving one scenario."""
+
+    def __init__(self, scenario, client, identity, args, rng):
+        self.scenario = scenario
+        self.client = client
+        self.identity = identity
+        self.args = args
+        self.rng = rng
+        self.n = 0
+        self.revision = None
+
+    def setup(self):
+        if self.scenario in ("admin", "pdf_admin"):
+            login_admin(self.client, self.args.admin_email, self.args.admin_password)
+        else:
+            login_applicant(self.client, self.identity[0])
+
+    def step(self):
+        """Make one request; return True if it got the response the route should give."""
+        self.n += 1
+        app_id = self.identity[1] if self.identity else None
+
+        if self.scenario == "autosave":
+            data = {"essay1": f"Draft {self.n}: " + "more words " * 100}
+            if self.revision is not None:
+                data["revision"] = self.revision
+            status, _, body = self.client.request("POST", "/autosave", data=data)
+            if status in (200, 409):
+                self.revision = json.loads(body).get("revision", self.revision)
+            return status == 200
+
+        if self.scenario == "submit":
+            status, headers, _ = self.client.request("POST", "/submit", data=submit_form(self.n))
+            return status == 302 and headers.get("Location", "").endswith("/dashboard")
+
+        if self.scenario == "dashboard":
+            status, _, _ = self.client.request("GET", "/dashboard")
+            return status == 200
+
+        if self.scenario == "admin":
+            path = self.rng.choice(["/admin", "/admin?status=submitted", "/admin?review_status=accepted"])
+            status, _, _ = self.client.request("GET", path)
+            return status == 200
+
+        if self.scenario == "pdf_user":
+            status, _, body = self.client.request("GET", f"/download_user_pdf/{app_id}")
+            return status == 200 and body.startswith(b"%PDF")
+
+        if self.scenario == "pdf_admin":
+            # A different application each time, so most of these are real renders
+            status, _, body = self.client.request("GET", f"/admin/pdf/{self.rng.choice(self.args.submitted_ids)}")
+            return status == 200 and body.startswith(b"%PDF")
+
+        if self.scenario == "letter":
+            status, _, body = self.client.request("GET", f"/download_letter/{app_id}")
+            return status == 200 and body.startswith(b"%PDF")
+
+        raise ValueError(f"Unknown scenario {self.scenario}")
+
+
+def scenario_identities(scenario, concurrency):
+    if scenario == "autosave":
+        return bench_identities("incomplete", concurrency)
+    if scenario == "submit":
+        # Separate applicants from autosave: once submitted they can no longer autosave
+        return bench_identities("incomplete", concurrency, offset=concurrency)
+    if scenario == "letter":
+        with portal.pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT u.email, a.id FROM users u JOIN applications a ON a.user_id = u.id
+                WHERE a.review_status IN ('accepted', 'rejected', 'waitlisted') AND u.email LIKE %s
+                ORDER BY a.id LIMIT %s
+            """, (f"%@{BENCH_EMAIL_DOMAIN}", concurrency))
+            return cursor.fetchall()
+    if scenario in ("admin", "pdf_admin"):
+        return [None] * concurrency
+    return bench_identities("submitted", concurrency)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[q - 1]
+
+
+def run_scenario(scenario, make_client, args):
+    identities = scenario_identities(scenario, args.concurrency)
+    if len(identities) < args.concurrency:
+        raise RuntimeError(f"Not enough seeded applicants for {scenario}; seed a larger cohort")
+
+    users = [VirtualUser(scenario, make_client(), identity, args, random.Random(i))
+             for i, identity in enumerate(identities)]
+    for user in users:
+        user.setup()
+
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    stop_at = measure_from + args.duration
+
+    def drive(user):
+        while True:
+            began = time.perf_counter()
+            if began >= stop_at:
+                return
+            try:
+                ok = user.step()
+            except Exception as e:
+                print(f"  {scenario}: {type(e).__name__}: {e}")
+                ok = False
+            finished = time.perf_counter()
+            if finished >= measure_from:
+                with lock:
+                    latencies.append(finished - began)
+                    if not ok:
+                        errors[0] += 1
+
+    threads = [threading.Thread(target=drive, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(ms),
+        "errors": errors[0],
+        "throughput_rps": round(len(ms) / args.duration, 2),
+        "p50_ms": round(percentile(ms, 50), 2) if ms else None,
+        "p95_ms": round(percentile(ms, 95), 2) if ms else None,
+        "p99_ms": round(percentile(ms, 99), 2) if ms else None,
+        "mean_ms": round(statistics.fmean(ms), 2) if ms else None,
+        "max_ms": round(ms[-1], 2) if ms else None,
+    }
+
+
+def run_export(make_client, args):
+    """Seconds for a cold export, an unchanged re-export, and a re-export after some review decisions."""
+    with portal.pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM export_jobs WHERE status <> 'running'")
+        conn.commit()
+    for directory in (portal.PDF_CACHE_DIR, portal.EXPORT_DIR):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    client = make_client()
+    login_admin(client, args.admin_email, args.admin_password)
+    result = {}
+    for run in ("cold", "repeat", "after_changes"):
+        if run == "after_changes":
+            changed = random.Random(0).sample(args.submitted_ids, min(args.export_changes, len(args.submitted_ids)))
+            client.request("POST", "/admin/review_status", json_body={"ids": changed, "status": "on_hold"})
+
+        began = time.perf_counter()
+        status, _, body = client.request("POST", "/admin/exports")
+        if status not in (200, 202):
+            raise RuntimeError(f"Export did not start (HTTP {status})")
+        job = json.loads(body)
+        while job["status"] == "running":
+            time.sleep(0.5)
+            job = json.loads(client.request("GET", job["status_url"])[2])
+        result[f"{run}_s"] = round(time.perf_counter() - began, 2)
+        result[f"{run}_reused"] = job["reused"]
+        result[f"{run}_failed"] = job["failed"]
+        print(f"  export {run}: {result[f'{run}_s']}s ({job['processed']} applications, {job['reused']} reused)")
+    return result
+
+
+def git_revision():
+    try:
+        root = portal.app.root_path
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=root, text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def cohort_size():
+    with portal.pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT (SELECT count(*) FROM applications), (SELECT count(*) FROM applications WHERE status = 'submitted'),
+                   (SELECT count(*) FROM activities)
+        """)
+        applications, submitted, activities = cursor.fetchone()
+        cursor.execute("SELECT id FROM applications WHERE status = 'submitted' ORDER BY id")
+        submitted_ids = [row[0] for row in cursor.fetchall()]
+    return {"applications": applications, "submitted": submitted, "activities": activities}, submitted_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2, help="unmeasured seconds before each scenario")
+    parser.add_argument("--export-changes", type=int, default=10,
+                        help="review decisions made before the last export run")
+    parser.add_argument("--url", help="benchmark a running server instead of an in-process client")
+    parser.add_argument("--admin-email", default=os.getenv("ADMIN_EMAIL_1", "admin@bench.invalid"))
+    parser.add_argument("--admin-password", default=os.getenv("ADMIN_PASS_1", "bench-admin"))
+    parser.add_argument("--report", default="bench-report.json", help="where to write the JSON report")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+    else:
+        # The in-process app checks admin logins against these
+        os.environ.setdefault("ADMIN_EMAIL_1", args.admin_email)
+        os.environ.setdefault("ADMIN_PASS_1", args.admin_password)
+        make_client = InProcessClient
+
+    cohort, args.submitted_ids = cohort_size()
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "target": args.url or "in-process",
+        "cohort": cohort,
+        "settings": {"concurrency": args.concurrency, "duration_s": args.duration, "warmup_s": args.warmup,
+                     "pdf_render_workers": portal.PDF_RENDER_WORKERS, "db_pool_max": portal.DB_POOL_MAX},
+        "scenarios": {},
+    }
+    print(f"Cohort: {cohort['applications']} applications ({cohort['submitted']} submitted), "
+          f"{cohort['activities']} activities; target {report['target']}")
+
+    for scenario in scenarios:
+        print(f"Running {scenario}...")
+        if scenario == "export":
+            report["export"] = run_export(make_client, args)
+        else:
+            report["scenarios"][scenario] = run_scenario(scenario, make_client, args)
+
+    print(f"\n{'scenario':12} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for scenario, r in report["scenarios"].items():
+        print(f"{scenario:12} {r['requests']:>9} {r['errors']:>7} {r['throughput_rps']:>8} "
+              f"{r['p50_ms']!s:>9} {r['p95_ms']!s:>9} {r['p99_ms']!s:>9}")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Compare the PDF engines on the app's PDF templates.
+
+    python bench/pdf_engines.py [--runs 5] [--json pdf_engines.json]
+
+Every (template, engine) pair is measured in a fresh process: one warm-up
+render (engine imports, font loading), then `runs` timed renders. Reported per
+pair: median and max render time, peak RSS of the process, peak Python heap
+during a render, and the size of the PDF produced. Use the result to set
+PDF_ENGINE_SUBMITTED / PDF_ENGINE_RESPONSE / PDF_ENGINE_LETTER.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as portal  # noqa: E402
+
+ESSAY = ("I want to study how solar-powered irrigation can help farmers in my village "
+         "grow food through the dry season. ") * 8
+
+SAMPLE_APPLICATION = {
+    "id": 1, "student_name": "Amina Okafor", "student_gender": "Female", "dob": "2008-03-14",
+    "email": "amina@example.org", "phone": "+234 800 000 0000", "grade": "11",
+    "parent_name": "Chidi Okafor", "parent_contact": "+234 800 000 0001",
+    "school_name": "Unity Secondary School", "school_location": "Enugu", "school_contact": "+234 800 000 0002",
+    "teacher_name": "Mrs. Eze", "teacher_contact": "+234 800 000 0003", "teacher_email": "eze@school.edu.ng",
+    "subjects": "Physics, Chemistry, Mathematics", "interests": "Renewable energy, agriculture",
+    "accommodation_required": "No", "accommodation_comment": "",
+    "essay1": ESSAY, "essay2": ESSAY, "essay3": ESSAY, "optional_info": ESSAY[:300],
+    "grade_report_path": "/mnt/data/uploads/report.pdf", "upload_path": None,
+    "status": "submitted", "review_status": "accepted",
+}
+
+SAMPLE_ACTIVITIES = [
+    {"id": i, "activity_type": "Club", "activity_position": "President",
+     "activity_org": f"Science Club {i}", "activity_desc": "Organised weekly experiments for 40 students."}
+    for i in range(1, 6)
+]
+
+TEMPLATES = ["submitted_pdf.html", "pdf_template.html", "letter_pdf_template.html"]
+
+
+def render_html(template_name):
+    if template_name == "submitted_pdf.html":
+        context = dict(app=SAMPLE_APPLICATION, activities=SAMPLE_ACTIVITIES)
+    elif template_name == "pdf_template.html":
+        context = dict(app_data=SAMPLE_APPLICATION, activities=SAMPLE_ACTIVITIES)
+    else:
+        context = dict(content="<p>Dear Amina Okafor,</p><p>We are thrilled to inform you that you have been "
+                               "accepted into the program.</p>" * 3,
+                       student_name="Amina Okafor", review_status="accepted",
+                       today="July 30, 2025", **portal.letter_images())
+    return portal.render_template(template_name, **context)
+
+
+def measure(template_name, engine, runs, results):
+    try:
+        with portal.app.test_request_context():
+            html = render_html(template_name)
+        pdf = portal.html_to_pdf(html, engine)  # warm-up
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            portal.html_to_pdf(html, engine)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        portal.html_to_pdf(html, engine)
+        _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.put({
+            "template": template_name, "engine": engine,
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "max_ms": round(max(timings) * 1000, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "py_peak_mb": round(py_peak / 2 ** 20, 1),
+            "pdf_kb": round(len(pdf) / 1024, 1),
+        })
+    except Exception as e:
+        results.put({"template": template_name, "engine": engine, "error": f"{type(e).__name__}: {e}"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    # spawn, not fork: each pair starts from a clean interpreter rather than a copy of
+    # this one, which may already have imported weasyprint while checking it is installed
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for template_name in TEMPLATES:
+        for engine in portal.PDF_ENGINES:
+            if engine == "weasyprint" and portal.load_weasyprint() is None:
+                rows.append({"template": template_name, "engine": engine, "error": "not installed"})
+                continue
+            results = ctx.Queue()
+            proc = ctx.Process(target=measure, args=(template_name, engine, args.runs, results))
+            proc.start()
+            rows.append(results.get())
+            proc.join()
+
+    print(f"{'template':26} {'engine':11} {'median ms':>10} {'max ms':>8} {'peak RSS MB':>12} {'py peak MB':>11} {'PDF KB':>8}")
+    for row in rows:
+        if "error" in row:
+            print(f"{row['template']:26} {row['engine']:11} {row['error']}")
+        else:
+            print(f"{row['template']:26} {row['engine']:11} {row['median_ms']:>10} {row['max_ms']:>8} "
+                  f"{row['peak_rss_mb']:>12} {row['py_peak_mb']:>11} {row['pdf_kb']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": args.runs, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Seed a benchmark database with a synthetic cohort.
+
+    DB_NAME=pear_bench python bench/seed.py --scale 10000
+
+Connects with the same DB_* settings as the app, applies the migrations, then
+truncates users, applications, activities, the email outbox and export jobs
+and fills them with `scale` applicants. About 70% have submitted; every
+application has three essays and 0-5 activities; a third of the submitted ones
+point at a shared grade report in UPLOAD_DIR. The data only depends on
+--scale and --seed, so two runs at the same settings are comparable.
+
+Refuses to touch a database whose name does not end in "bench" unless --force.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as portal  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+# Every seeded applicant logs in with this password; bench/load.py uses it
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL_DOMAIN = "bench.invalid"
+GRADE_REPORT_NAME = "bench_grade_report.pdf"
+
+ESSAY_TEXT = ("Growing up near the river, I watched farmers lose their harvest every dry season and "
+              "wondered why the water that flooded us in July could not be saved for January. ")
+
+
+def seed(scale, seed_value):
+    grade_report = os.path.join(portal.UPLOAD_DIR, GRADE_REPORT_NAME)
+    with open(grade_report, "wb") as f:
+        f.write(b"%PDF-1.4\n" + b"% bench grade report\n" * 4000)
+
+    with portal.pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            TRUNCATE users, applications, activities, email_outbox, export_jobs RESTART IDENTITY CASCADE
+        """)
+        cursor.execute("SELECT setseed(%s)", (seed_value,))
+
+        cursor.execute("""
+            INSERT INTO users (email, password_hash, student_name)
+            SELECT 'applicant' || g || '@' || %s, %s, 'Applicant ' || g
+            FROM generate_series(1, %s) g
+        """, (BENCH_EMAIL_DOMAIN, generate_password_hash(BENCH_PASSWORD), scale))
+
+        cursor.execute("""
+            INSERT INTO applications (
+                user_id, student_name, student_gender, dob, email, phone, grade,
+                parent_name, parent_contact, school_name, school_location, school_contact,
+                teacher_name, teacher_contact, teacher_email, subjects, interests,
+                accommodation_required, essay1, essay2, essay3, optional_info,
+                status, created_at
+            )
+            SELECT u.id, u.student_name, (ARRAY['Female', 'Male'])[1 + (u.id %% 2)], '2008-03-14', u.email,
+                   '+234 800 000 ' || lpad(u.id::text, 4, '0'), (9 + u.id %% 4)::text,
+                   'Parent of ' || u.student_name, '+234 800 111 0000',
+                   'School ' || (u.id %% 400), 'Lagos', '+234 800 222 0000',
+                   'Teacher ' || (u.id %% 900), '+234 800 333 0000', 'teacher' || (u.id %% 900) || '@school.invalid',
+                   'Physics, Chemistry, Mathematics', 'Renewable energy',
+                   'No', left(repeat(%s, 30), 1500 + (random() * 1500)::int),
+                   left(repeat(%s, 30), 1500 + (random() * 1500)::int),
+                   left(repeat(%s, 30), 1500 + (random() * 1500)::int), '',
+                   CASE WHEN random() < 0.7 THEN 'submitted' ELSE 'incomplete' END,
+                   timestamptz '2025-06-01 00:00+00' + random() * interval '30 days'
+            FROM users u ORDER BY u.id
+        """, (ESSAY_TEXT, ESSAY_TEXT, ESSAY_TEXT))
+
+        cursor.execute("""
+            UPDATE applications SET
+                submitted_at = created_at + random() * interval '20 days',
+                review_status = (ARRAY['accepted', 'rejected', 'waitlisted', 'on_hold', NULL])[1 + floor(random() * 5)::int],
+                grade_report_path = CASE WHEN id %% 3 = 0 THEN %s END
+            WHERE status = 'submitted'
+        """, (grade_report,))
+
+        cursor.execute("""
+            INSERT INTO activities (application_id, activity_type, activity_position, activity_org, activity_desc)
+            SELECT a.id, (ARRAY['Club', 'Sport', 'Volunteering', 'Work'])[1 + n % 4], 'Member',
+                   'Organisation ' || n, 'Weekly meetings, planning and running events for younger students.'
+            FROM applications a
+            -- a.id * 0 correlates the series with the row, so random() is drawn per application
+            CROSS JOIN LATERAL generate_series(1, floor(random() * 6)::int + a.id * 0) n
+            ORDER BY a.id, n
+        """)
+
+        cursor.execute("""
+            SELECT (SELECT count(*) FROM users), (SELECT count(*) FROM applications),
+                   (SELECT count(*) FROM applications WHERE status = 'submitted'), (SELECT count(*) FROM activities)
+        """)
+        counts = cursor.fetchone()
+        conn.commit()
+        cursor.execute("ANALYZE users, applications, activities")
+        conn.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000, help="number of applicants (e.g. 1000, 10000, 50000)")
+    parser.add_argument("--seed", type=float, default=0.42, help="PostgreSQL setseed() value, between -1 and 1")
+    parser.add_argument("--force", action="store_true", help="seed even if DB_NAME does not end in 'bench'")
+    args = parser.parse_args()
+
+    if not (os.getenv("DB_NAME") or "").endswith("bench") and not args.force:
+        sys.exit(f"Refusing to truncate database {os.getenv('DB_NAME')!r}: use a *bench database or --force")
+
+    portal.apply_migrations()
+    start = time.perf_counter()
+    users, applications, submitted, activities = seed(args.scale, args.seed)
+    print(f"Seeded {users} applicants, {applications} applications ({submitted} submitted), "
+          f"{activities} activities in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
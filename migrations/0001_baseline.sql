@@ -1,3 +1,14 @@
+-- Tables as app.py uses them. Written to be safe against databases that were
+-- created by hand from the old schema.sql: tables and columns are only added
+-- when missing.
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    email TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    student_name TEXT,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
 
 CREATE TABLE IF NOT EXISTS applications (
     id SERIAL PRIMARY KEY,
@@ -26,6 +37,15 @@ CREATE TABLE IF NOT EXISTS applications (
     file_path TEXT
 );
 
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id);
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS teacher_email TEXT;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS grade_report_path TEXT;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS upload_path TEXT;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS status TEXT DEFAULT 'incomplete';
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS review_status TEXT;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS submitted_at TIMESTAMPTZ;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ DEFAULT now();
+
 CREATE TABLE IF NOT EXISTS activities (
     id SERIAL PRIMARY KEY,
     application_id INTEGER REFERENCES applications(id) ON DELETE CASCADE,
@@ -35,7 +55,7 @@ CREATE TABLE IF NOT EXISTS activities (
     activity_desc TEXT
 );
 
-CREATE TABLE letters (
+CREATE TABLE IF NOT EXISTS letters (
     id INTEGER PRIMARY KEY,
     status TEXT UNIQUE NOT NULL,
     content TEXT NOT NULL
@@ -44,4 +64,5 @@ CREATE TABLE letters (
 INSERT INTO letters (id, status, content) VALUES
 (1, 'accepted', '<p>Dear {{ student_name }},</p><p>We are thrilled to inform you that you have been accepted into the program. We look forward to having you!</p>'),
 (2, 'rejected', '<p>Dear {{ student_name }},</p><p>Thank you for applying. Unfortunately, you have not been selected at this time.</p>'),
-(3, 'waitlisted', '<p>Dear {{ student_name }},</p><p>Your application is currently waitlisted. We will notify you if space becomes available.</p>');
+(3, 'waitlisted', '<p>Dear {{ student_name }},</p><p>Your application is currently waitlisted. We will notify you if space becomes available.</p>')
+ON CONFLICT DO NOTHING;
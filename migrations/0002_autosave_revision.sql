@@ -0,0 +1,2 @@
+-- Draft revision used by /autosave to reject stale writes
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS revision INTEGER NOT NULL DEFAULT 0;
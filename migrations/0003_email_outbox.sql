@@ -0,0 +1,18 @@
+-- Transactional email, written in the same transaction as the change that
+-- triggers it and delivered by `flask --app app send-outbox`
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    subject TEXT NOT NULL,
+    recipients TEXT[] NOT NULL,
+    bcc TEXT[] NOT NULL DEFAULT '{}',
+    body TEXT NOT NULL,
+    html TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    sent_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS email_outbox_due_idx ON email_outbox (next_attempt_at) WHERE status = 'pending';
@@ -0,0 +1,20 @@
+-- Indexes for the queries app.py runs on every request.
+-- `flask --app app check-query-plans` fails if any of them stops being used.
+
+-- Latest application for a user: WHERE user_id = ? ORDER BY id DESC LIMIT 1
+CREATE INDEX IF NOT EXISTS applications_user_id_id_idx ON applications (user_id, id DESC);
+
+-- Activities of an application
+CREATE INDEX IF NOT EXISTS activities_application_id_idx ON activities (application_id, id);
+
+-- Login, registration and password reset look users up by email
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON users (email);
+
+-- Admin listing, keyset-paginated on (submitted_at DESC NULLS LAST, id DESC),
+-- unfiltered, filtered to submitted rows, and filtered by review status
+CREATE INDEX IF NOT EXISTS applications_submitted_at_id_idx
+    ON applications (submitted_at DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS applications_submitted_idx
+    ON applications (submitted_at DESC NULLS LAST, id DESC) WHERE status = 'submitted';
+CREATE INDEX IF NOT EXISTS applications_review_status_idx
+    ON applications (review_status, submitted_at DESC NULLS LAST, id DESC);
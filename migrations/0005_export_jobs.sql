@@ -0,0 +1,20 @@
+-- Background cohort exports (POST /admin/exports). manifest maps each exported
+-- application id to its fingerprint and archive entries, so the next export
+-- can copy unchanged applications out of this one's archive.
+CREATE TABLE IF NOT EXISTS export_jobs (
+    id SERIAL PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'running',
+    total INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    reused INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    artifact_path TEXT,
+    manifest JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+-- At most one export runs at a time
+CREATE UNIQUE INDEX IF NOT EXISTS export_jobs_one_running ON export_jobs ((true)) WHERE status = 'running';
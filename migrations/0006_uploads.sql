@@ -0,0 +1,12 @@
+-- Content-addressed upload store: one row, and one file named by its SHA-256,
+-- per distinct upload. applications.grade_report_path / upload_path refer to
+-- uploads.path, so a file uploaded twice is stored once. preview_path is the
+-- first-page thumbnail, filled in by a background step.
+CREATE TABLE IF NOT EXISTS uploads (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    content_type TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    preview_path TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
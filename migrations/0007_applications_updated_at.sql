@@ -0,0 +1,31 @@
+-- applications.updated_at moves on every write to an application or to its
+-- activities, whichever code path makes it; the read routes build their ETags
+-- from it, so it has to be kept by the database rather than by each UPDATE.
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION applications_touch() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS applications_touch ON applications;
+CREATE TRIGGER applications_touch BEFORE UPDATE ON applications
+    FOR EACH ROW EXECUTE FUNCTION applications_touch();
+
+CREATE OR REPLACE FUNCTION activities_touch_application() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE applications SET updated_at = clock_timestamp() WHERE id = OLD.application_id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        UPDATE applications SET updated_at = clock_timestamp() WHERE id = NEW.application_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS activities_touch_application ON activities;
+CREATE TRIGGER activities_touch_application AFTER INSERT OR UPDATE OR DELETE ON activities
+    FOR EACH ROW EXECUTE FUNCTION activities_touch_application();
@@ -0,0 +1,38 @@
+-- activities_touch_application ran once per activity row, so saving a form
+-- with ten activities updated its application ten times. Touch each affected
+-- application once per statement instead, from the statement's transition
+-- tables. A trigger with transition tables can only fire on one event, hence
+-- one trigger per event sharing the function.
+CREATE OR REPLACE FUNCTION activities_touch_application() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE applications SET updated_at = clock_timestamp()
+        WHERE id IN (SELECT application_id FROM new_activities);
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE applications SET updated_at = clock_timestamp()
+        WHERE id IN (SELECT application_id FROM old_activities
+                     UNION SELECT application_id FROM new_activities);
+    ELSE
+        UPDATE applications SET updated_at = clock_timestamp()
+        WHERE id IN (SELECT application_id FROM old_activities);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS activities_touch_application ON activities;
+
+DROP TRIGGER IF EXISTS activities_touch_application_insert ON activities;
+CREATE TRIGGER activities_touch_application_insert AFTER INSERT ON activities
+    REFERENCING NEW TABLE AS new_activities
+    FOR EACH STATEMENT EXECUTE FUNCTION activities_touch_application();
+
+DROP TRIGGER IF EXISTS activities_touch_application_update ON activities;
+CREATE TRIGGER activities_touch_application_update AFTER UPDATE ON activities
+    REFERENCING OLD TABLE AS old_activities NEW TABLE AS new_activities
+    FOR EACH STATEMENT EXECUTE FUNCTION activities_touch_application();
+
+DROP TRIGGER IF EXISTS activities_touch_application_delete ON activities;
+CREATE TRIGGER activities_touch_application_delete AFTER DELETE ON activities
+    REFERENCING OLD TABLE AS old_activities
+    FOR EACH STATEMENT EXECUTE FUNCTION activities_touch_application();
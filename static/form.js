@@ -8,33 +8,91 @@ document.addEventListener('DOMContentLoaded', function () {
 
 
 let autosaveTimeout;
+let autosaveRevision = window.draftRevision || 0;
+let lastSavedState = null;   // snapshot of what the server already has
+let saveInFlight = false;
+let saveQueued = false;
+
+const ACTIVITY_FIELDS = ['activity_type[]', 'activity_position[]', 'activity_org[]', 'activity_desc[]'];
+
+// Plain field values plus the activity lists, without file inputs
+function collectAutosaveState() {
+  const formData = new FormData(document.getElementById('application-form'));
+  const fields = {};
+  for (const [key, value] of formData.entries()) {
+    if (value instanceof File || key === 'activity_id[]' || ACTIVITY_FIELDS.includes(key)) continue;
+    fields[key] = value;
+  }
+  const activities = ACTIVITY_FIELDS.map(name => formData.getAll(name));
+  return { fields, activities: JSON.stringify(activities) };
+}
 
 function autosaveFormData() {
-  const form = document.getElementById('application-form');
-  const formData = new FormData(form);
   const statusBox = document.getElementById('autosave-status');
 
+  if (saveInFlight) {
+    saveQueued = true;  // save again once the current request settles
+    return;
+  }
+
+  const state = collectAutosaveState();
+  const payload = new FormData();
+  let dirty = false;
+
+  for (const [key, value] of Object.entries(state.fields)) {
+    if (!lastSavedState || lastSavedState.fields[key] !== value) {
+      payload.append(key, value);
+      dirty = true;
+    }
+  }
+  if (!lastSavedState || lastSavedState.activities !== state.activities) {
+    // Send the whole list; activity_id[] lets the server update rows in place
+    const activities = JSON.parse(state.activities);
+    document.querySelectorAll('input[name="activity_id[]"]').forEach(el => payload.append('activity_id[]', el.value));
+    ACTIVITY_FIELDS.forEach((name, i) => activities[i].forEach(v => payload.append(name, v)));
+    payload.append('activities_sent', '1');
+    dirty = true;
+  }
+  if (!dirty) return;
+
+  payload.append('revision', autosaveRevision);
+  saveInFlight = true;
   statusBox.textContent = "Saving...";
 
   fetch('/autosave', {
     method: 'POST',
-    body: formData
+    body: payload
   })
   .then(response => response.json())
   .then(data => {
     if (data.success) {
+      lastSavedState = state;
+      autosaveRevision = data.revision;
+      if (data.activity_ids) {
+        const idInputs = document.querySelectorAll('input[name="activity_id[]"]');
+        data.activity_ids.forEach((id, i) => {
+          if (id !== null && idInputs[i]) idInputs[i].value = id;
+        });
+      }
       const now = new Date();
       const timeString = now.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
       statusBox.textContent = `Last saved at ${timeString}`;
       setTimeout(() => { statusBox.textContent = ""; }, 5000);
     } else {
-      statusBox.textContent = "Unable to save draft.";
+      statusBox.textContent = data.error || "Unable to save draft.";
       setTimeout(() => { statusBox.textContent = ""; }, 5000);
     }
   })
   .catch(() => {
     statusBox.textContent = "Network error. Changes may not be saved.";
     setTimeout(() => { statusBox.textContent = ""; }, 5000);
+  })
+  .finally(() => {
+    saveInFlight = false;
+    if (saveQueued) {
+      saveQueued = false;
+      autosaveFormData();
+    }
   });
 }
 
@@ -220,12 +278,13 @@ nextBtns.forEach(btn => {
   const container = document.getElementById('activities-container');
 
 
-function createActivityBlock(type = '', position = '', org = '', desc = '') {
+function createActivityBlock(type = '', position = '', org = '', desc = '', id = '') {
   const div = document.createElement('div');
   div.className = 'activity-block';
   div.innerHTML = `
     <hr />
     <h3>Activity</h3>
+    <input type="hidden" name="activity_id[]" value="${id}" />
     <label>Activity Type<input name="activity_type[]" value="${type}" required /></label>
     <label>Position<input name="activity_position[]" value="${position}" maxlength="50" required /></label>
     <label>Organization<input name="activity_org[]" value="${org}" maxlength="100" required /></label>
@@ -234,7 +293,11 @@ function createActivityBlock(type = '', position = '', org = '', desc = '') {
   `;
 
   const removeBtn = div.querySelector('.remove-activity');
-  removeBtn.addEventListener('click', () => div.remove());
+  removeBtn.addEventListener('click', () => {
+    div.remove();
+    clearTimeout(autosaveTimeout);
+    autosaveTimeout = setTimeout(autosaveFormData, 800);
+  });
   
 
 
@@ -276,11 +339,17 @@ if (window.prefilledActivities && window.prefilledActivities.length) {
       act.activity_type,
       act.activity_position,
       act.activity_org,
-      act.activity_desc
+      act.activity_desc,
+      act.id
     ));
   });
 }
 
+// Everything rendered from the saved draft is already on the server
+if (window.draftRevision) {
+  lastSavedState = collectAutosaveState();
+}
+
 
 // File Size Validation (5MB limit)
 const maxSize = 5 * 1024 * 1024; // 5MB
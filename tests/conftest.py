@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.py creates its data directories at import time; point them somewhere
+# writable before it is imported. Subprocesses started by the tests inherit this.
+_data_dir = tempfile.mkdtemp(prefix="portal-tests-")
+for name in ("UPLOAD_DIR", "PDF_CACHE_DIR", "EXPORT_DIR", "AUTOSAVE_JOURNAL_DIR"):
+    os.environ[name] = os.path.join(_data_dir, name.lower())
+os.environ.setdefault("SUBMISSION_DEADLINE", "2100-01-01T00:00:00+00:00")
+# No background autosave flusher (it needs the database) in test requests
+os.environ.setdefault("AUTOSAVE_FLUSH_INTERVAL", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+
+@pytest.fixture(scope="session")
+def db():
+    """A connection to the database configured by DB_*; tests using it are skipped without one."""
+    import psycopg2
+
+    import app as portal
+
+    try:
+        conn = portal.get_pool().getconn()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"database not available: {e}")
+    yield conn
+    portal.get_pool().putconn(conn, rollback=True)
@@ -0,0 +1,108 @@
+from werkzeug.datastructures import MultiDict
+
+import app as portal
+
+
+def activity_form(*blocks):
+    form = MultiDict()
+    for block in blocks:
+        for field, value in zip(("id", "type", "position", "org", "desc"), block):
+            form.add(f"activity_{field}[]", value)
+    return form
+
+
+class FakeCursor:
+    def __init__(self, stored):
+        self.stored = stored
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.stored
+
+
+class FakeConnection:
+    def __init__(self, stored):
+        self.cursor_ = FakeCursor(stored)
+
+    def cursor(self):
+        return self.cursor_
+
+
+def fake_execute_values(calls, next_id=100):
+    ids = iter(range(next_id, next_id + 1000))
+
+    def execute_values(cursor, sql, rows, fetch=False):
+        calls.append((sql.split()[0], rows))
+        if fetch:
+            return [(next(ids),) for _ in rows]
+    return execute_values
+
+
+def test_read_activity_rows_cleans_blocks_and_skips_empty_types():
+    form = activity_form(
+        ("7", " Club\xa0", "Chair", "School", "Weekly"),
+        ("", "  ", "", "", ""),
+        ("abc", "Sport", "Captain", "Team", "Games"),
+    )
+    assert portal.read_activity_rows(form) == [
+        (7, "Club", "Chair", "School", "Weekly"),
+        None,
+        (None, "Sport", "Captain", "Team", "Games"),
+    ]
+
+
+def test_read_activity_rows_tolerates_missing_fields():
+    form = MultiDict([("activity_type[]", "Music")])
+    assert portal.read_activity_rows(form) == [(None, "Music", "", "", "")]
+
+
+def test_sync_activities_inserts_updates_and_deletes_by_id(monkeypatch):
+    calls = []
+    monkeypatch.setattr(portal, "execute_values", fake_execute_values(calls))
+    conn = FakeConnection([
+        (1, "Club", "Chair", "School", "Weekly"),
+        (2, "Sport", "Captain", None, "Games"),
+        (3, "Music", "", "", ""),
+    ])
+    rows = [
+        (1, "Club", "Chair", "School", "Weekly"),
+        (2, "Sport", "Captain", "Team", "Games"),
+        None,
+        (None, "Art", "", "", ""),
+    ]
+
+    changed, ids = portal.sync_activities(conn, 42, rows)
+
+    assert changed
+    assert ids == [1, 2, None, 100]
+    assert calls == [
+        ("INSERT", [(42, "Art", "", "", "")]),
+        ("UPDATE", [(2, "Sport", "Captain", "Team", "Games")]),
+    ]
+    assert conn.cursor_.executed[-1][1] == (42, [3])
+
+
+def test_sync_activities_matches_by_position_without_ids(monkeypatch):
+    calls = []
+    monkeypatch.setattr(portal, "execute_values", fake_execute_values(calls))
+    conn = FakeConnection([(5, "Club", "", "", ""), (6, "Sport", "", "", "")])
+
+    changed, ids = portal.sync_activities(conn, 42, [(None, "Club", "", "", ""), (None, "Art", "", "", "")])
+
+    assert changed
+    assert ids == [5, 6]
+    assert calls == [("UPDATE", [(6, "Art", "", "", "")])]
+    assert len(conn.cursor_.executed) == 1
+
+
+def test_sync_activities_unchanged_rows_write_nothing(monkeypatch):
+    calls = []
+    monkeypatch.setattr(portal, "execute_values", fake_execute_values(calls))
+    conn = FakeConnection([(5, "Club", "Chair", "", "")])
+
+    assert portal.sync_activities(conn, 42, [(5, "Club", "Chair", "", "")]) == (False, [5])
+    assert calls == []
+    assert len(conn.cursor_.executed) == 1
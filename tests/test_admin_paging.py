@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import app as portal
+
+
+def test_page_cursor_round_trips():
+    submitted_at = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = portal.encode_page_cursor({"submitted_at": submitted_at, "id": 17})
+    assert portal.decode_page_cursor(cursor) == (submitted_at, 17)
+
+
+def test_page_cursor_without_submission_time():
+    cursor = portal.encode_page_cursor({"submitted_at": None, "id": 4})
+    assert cursor == "|4"
+    assert portal.decode_page_cursor(cursor) == (None, 4)
+
+
+@pytest.mark.parametrize("value", [None, "", "17", "yesterday|3", "2025-03-01|x", "|"])
+def test_malformed_page_cursor_is_rejected(value):
+    assert portal.decode_page_cursor(value) is None
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+import pytest
+
+import app as portal
+
+
+def lock_path(user_id):
+    return os.path.join(portal.AUTOSAVE_JOURNAL_DIR, f"{user_id}.lock")
+
+
+def test_lock_file_removed_when_nothing_is_buffered():
+    with portal.autosave_lock(901):
+        assert os.path.exists(lock_path(901))
+    assert not os.path.exists(lock_path(901))
+
+
+def test_lock_file_kept_while_a_draft_is_buffered():
+    with portal.autosave_lock(902):
+        portal.write_autosave_entry(902, {"fields": {}, "revision": 1})
+    assert os.path.exists(lock_path(902))
+
+    with portal.autosave_lock(902):
+        os.remove(portal.autosave_journal_path(902))
+    assert not os.path.exists(lock_path(902))
+
+
+def test_lock_excludes_across_lock_file_removal():
+    inside, overlaps = [], []
+
+    def hold():
+        with portal.autosave_lock(903):
+            if inside:
+                overlaps.append(True)
+            inside.append(True)
+            time.sleep(0.02)
+            inside.pop()
+
+    threads = [threading.Thread(target=hold) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
+    assert not os.path.exists(lock_path(903))
+
+
+def buffer_draft(cursor, user_id):
+    cursor.execute("SELECT id, revision FROM applications WHERE user_id = %s ORDER BY id DESC LIMIT 1", (user_id,))
+    app_id, revision = cursor.fetchone()
+    portal.write_autosave_entry(user_id, {
+        "application_id": app_id, "base_revision": revision, "revision": revision,
+        "fields": {}, "buffered_at": time.time(),
+    })
+
+
+def draft_user(db):
+    cursor = db.cursor()
+    cursor.execute("SELECT user_id FROM applications WHERE status IS DISTINCT FROM 'submitted' LIMIT 1")
+    row = cursor.fetchone()
+    db.rollback()
+    if row is None:
+        pytest.skip("no draft application")
+    return row[0]
+
+
+def test_flush_after_reads_commits_in_the_request(db):
+    user_id = draft_user(db)
+    with portal.app.test_request_context():
+        conn = portal.get_connection()
+        buffer_draft(conn.cursor(), user_id)
+        portal.flush_pending_autosave(user_id)
+        assert conn.info.transaction_status == portal.TRANSACTION_STATUS_IDLE
+    assert not os.path.exists(portal.autosave_journal_path(user_id))
+
+
+def test_flush_refuses_to_commit_the_requests_writes(db):
+    user_id = draft_user(db)
+    with portal.app.test_request_context():
+        conn = portal.get_connection()
+        cursor = conn.cursor()
+        buffer_draft(cursor, user_id)
+        cursor.execute("CREATE TEMP TABLE request_write (id int)")
+        with pytest.raises(RuntimeError):
+            portal.flush_pending_autosave(user_id)
+        conn.rollback()
+    assert os.path.exists(portal.autosave_journal_path(user_id))
+    os.remove(portal.autosave_journal_path(user_id))
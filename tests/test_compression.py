@@ -0,0 +1,64 @@
+import gzip
+
+import pytest
+from flask import Response
+
+import app as portal
+
+BODY = "<p>" + "Application details " * 200 + "</p>"
+
+
+def compress(body, accept_encoding="gzip", **kwargs):
+    with portal.app.test_request_context(headers={"Accept-Encoding": accept_encoding}):
+        return portal.compress_response(Response(body, **kwargs))
+
+
+def test_gzip_when_brotli_is_not_accepted():
+    response = compress(BODY)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(response.get_data()).decode() == BODY
+
+
+def test_brotli_preferred_when_available():
+    brotli = pytest.importorskip("brotli")
+    response = compress(BODY, "gzip, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()).decode() == BODY
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk():
+    response = compress((BODY for _ in range(3)), mimetype="text/csv")
+    assert response.is_streamed
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(b"".join(response.response)).decode() == BODY * 3
+
+
+def test_etag_becomes_weak():
+    with portal.app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = Response(BODY)
+        response.set_etag("abc")
+        response = portal.compress_response(response)
+    assert response.get_etag() == ("abc", True)
+
+
+def test_small_body_is_sent_as_is_but_still_varies():
+    response = compress("<p>ok</p>")
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"mimetype": "application/pdf"},
+    {"status": 304},
+    {"headers": {"Cache-Control": "no-transform"}},
+])
+def test_left_alone(kwargs):
+    response = compress(BODY, **kwargs)
+    assert "Content-Encoding" not in response.headers
+
+
+def test_identity_only_client_gets_plain_body():
+    response = compress(BODY, "identity")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data(as_text=True) == BODY
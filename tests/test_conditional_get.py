@@ -0,0 +1,32 @@
+import app as portal
+
+
+def test_not_modified_when_etag_matches():
+    with portal.app.test_request_context(headers={"If-None-Match": '"abc"'}):
+        response = portal.not_modified("abc")
+    assert response.status_code == 304
+    assert response.get_etag() == ("abc", False)
+    assert "Accept-Encoding" in response.vary
+    assert response.cache_control.no_cache and response.cache_control.private
+
+
+def test_not_modified_matches_weak_etag_from_compressed_response():
+    with portal.app.test_request_context(headers={"If-None-Match": 'W/"abc"'}):
+        assert portal.not_modified("abc").status_code == 304
+
+
+def test_modified_when_etag_differs_or_missing():
+    with portal.app.test_request_context(headers={"If-None-Match": '"old"'}):
+        assert portal.not_modified("abc") is None
+    with portal.app.test_request_context():
+        assert portal.not_modified("abc") is None
+        assert portal.not_modified(None) is None
+
+
+def test_version_etag_is_withheld_while_a_flash_is_pending():
+    with portal.app.test_request_context():
+        etag = portal.version_etag("2025-07-01", 3)
+        assert etag == portal.version_etag("2025-07-01", 3)
+        assert etag != portal.version_etag("2025-07-02", 3)
+        portal.flash("Saved")
+        assert portal.version_etag("2025-07-01", 3) is None
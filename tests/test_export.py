@@ -0,0 +1,13 @@
+import pytest
+
+import app as portal
+
+
+@pytest.mark.parametrize("value", ["=SUM(A1:A9)", "+1", "-1", "@cmd", "\tx", "\rx"])
+def test_csv_cell_defuses_formulas(value):
+    assert portal.csv_cell(value) == "'" + value
+
+
+@pytest.mark.parametrize("value", ["Jane", "", "a=b", 12, None])
+def test_csv_cell_leaves_other_values(value):
+    assert portal.csv_cell(value) == value
@@ -0,0 +1,37 @@
+from flask import Response
+
+import app as portal
+
+
+def request_count(endpoint, status=200):
+    key = tuple(sorted({"endpoint": endpoint, "method": "GET", "status": status}.items()))
+    series = portal.REQUEST_SECONDS._series.get(key)
+    return sum(series[:-1]) if series else 0
+
+
+def test_file_responses_are_timed():
+    before = request_count("static")
+    response = portal.app.test_client().get("/static/styles.css")
+    assert response.status_code == 200 and response.is_streamed
+    response.close()
+    assert request_count("static") == before + 1
+
+
+def test_stream_timed_defers_until_the_body_is_sent():
+    def body():
+        yield "a"
+        yield "b"
+
+    before = request_count("export_csv")
+    with portal.app.test_request_context("/admin/export.csv"):
+        portal.start_request_metrics()
+        stream = portal.stream_timed(body())
+        portal.note_response_status(Response(stream))
+        metrics = portal.current_request_metrics()
+        portal.finish_request_metrics(None)
+        # First teardown (the view has returned): nothing recorded yet
+        assert portal.current_request_metrics() is metrics
+        assert request_count("export_csv") == before
+    # stream_with_context tears the request down again once the body is exhausted
+    assert "".join(stream) == "ab"
+    assert request_count("export_csv") == before + 1
@@ -0,0 +1,29 @@
+import pytest
+from psycopg2.extras import RealDictCursor
+
+import app as portal
+
+
+def test_export_and_download_share_pdf_cache_key(db, monkeypatch):
+    cursor = db.cursor(cursor_factory=RealDictCursor)
+    cursor.execute(portal.EXPORT_COHORT_SQL)
+    rows = [row for row in cursor.fetchall() if row["activities"]]
+    db.rollback()
+    if not rows:
+        pytest.skip("no submitted application with activities")
+    row = rows[0]
+    app_id, user_id = row["id"], row["user_id"]
+    export_key = portal.pdf_cache_key("submitted_pdf.html", **portal.export_pdf_context(row))
+
+    download_keys = []
+
+    def render_pdf_cached(app_id, template_name, **context):
+        download_keys.append(portal.pdf_cache_key(template_name, **context))
+        return b"%PDF-1.4"
+
+    monkeypatch.setattr(portal, "render_pdf_cached", render_pdf_cached)
+    client = portal.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+    assert client.get(f"/download_user_pdf/{app_id}").status_code == 200
+    assert download_keys == [export_key]
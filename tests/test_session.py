@@ -0,0 +1,18 @@
+from psycopg2.extras import RealDictCursor
+
+import app as portal
+
+
+def test_repeat_visits_do_not_rewrite_the_session_cookie(db):
+    cursor = db.cursor(cursor_factory=RealDictCursor)
+    cursor.execute("SELECT user_id FROM applications ORDER BY id LIMIT 1")
+    user_id = cursor.fetchone()["user_id"]
+    db.rollback()
+
+    client = portal.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+    first = client.get("/dashboard")
+    assert "Set-Cookie" in first.headers  # application_id remembered
+    second = client.get("/dashboard")
+    assert "Set-Cookie" not in second.headers
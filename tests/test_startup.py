@@ -0,0 +1,11 @@
+import app as portal
+
+
+def test_startup_imports_no_forbidden_modules():
+    assert portal.forbidden_startup_modules() == []
+
+
+def test_startup_import_within_budget():
+    total_ms, packages = portal.profile_startup_imports()
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:5]
+    assert total_ms <= portal.STARTUP_IMPORT_BUDGET_MS, f"import app took {total_ms:.0f} ms; slowest: {slowest}"
@@ -0,0 +1,111 @@
+import os
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import app as portal
+
+PDF = b"%PDF-1.4\n" + b"0" * 100
+PNG = b"\x89PNG\r\n\x1a\n" + b"0" * 100
+
+
+def incoming_files():
+    return [name for name in os.listdir(portal.UPLOAD_DIR) if name.startswith(".incoming-")]
+
+
+def test_spool_hashes_and_sniffs_in_chunks():
+    spool = portal.UploadSpool("report.pdf")
+    for i in range(0, len(PDF), 3):
+        spool.write(PDF[i:i + 3])
+    spool.seek(0)
+    assert spool.kind == "pdf"
+    assert spool.size == len(PDF)
+    assert spool.sha256.hexdigest() == portal.hashlib.sha256(PDF).hexdigest()
+    assert spool.read() == PDF
+    spool.close()
+
+
+def test_spool_rejects_unknown_type_on_first_bytes():
+    spool = portal.UploadSpool("notes.txt")
+    with pytest.raises(portal.UnsupportedUpload):
+        spool.write(b"just some text")
+    spool.close()
+
+
+def test_spool_checks_files_shorter_than_the_magic_on_rewind():
+    spool = portal.UploadSpool("tiny.pdf")
+    spool.write(b"%PD")
+    with pytest.raises(portal.UnsupportedUpload):
+        spool.seek(0)
+    spool.close()
+
+
+def test_spool_accepts_docx_only_under_a_docx_name():
+    zip_head = b"PK\x03\x04" + b"0" * 20
+    spool = portal.UploadSpool("essay.docx")
+    spool.write(zip_head)
+    assert spool.kind == "docx"
+    spool.close()
+
+    spool = portal.UploadSpool("archive.zip")
+    with pytest.raises(portal.UnsupportedUpload):
+        spool.write(zip_head)
+    spool.close()
+
+
+def test_spool_enforces_size_limit(monkeypatch):
+    monkeypatch.setattr(portal, "UPLOAD_MAX_BYTES", 50)
+    spool = portal.UploadSpool("big.png")
+    spool.write(PNG[:40])
+    with pytest.raises(RequestEntityTooLarge):
+        spool.write(PNG[40:])
+    spool.close()
+
+
+def test_spool_file_is_removed_on_close():
+    before = set(incoming_files())
+    spool = portal.UploadSpool("report.pdf")
+    spool.write(PDF)
+    assert set(incoming_files()) - before
+    spool.close()
+    assert set(incoming_files()) == before
+
+
+def test_preview_render_holds_no_connection(monkeypatch):
+    from contextlib import contextmanager
+
+    from PIL import Image
+
+    held = []
+
+    class Cursor:
+        def execute(self, sql, params):
+            pass
+
+        def fetchone(self):
+            return ("/uploads/report.png", "image/png")
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+    @contextmanager
+    def pooled_connection():
+        held.append(True)
+        try:
+            yield Connection()
+        finally:
+            held.pop()
+
+    def first_page_image(path, content_type):
+        assert held == []
+        return Image.new("RGB", (640, 800))
+
+    monkeypatch.setattr(portal, "pooled_connection", pooled_connection)
+    monkeypatch.setattr(portal, "first_page_image", first_page_image)
+    path = portal.generate_upload_preview("ab" * 32)
+    assert path == os.path.join(portal.PREVIEW_DIR, "ab" * 32 + ".webp")
+    assert os.path.exists(path)